@@ -0,0 +1,6 @@
+# Reconstructing points from their distances to spheres and ellipsoids.
+#
+# Nothing is imported here so that `lei --help` stays free of torch; import the
+# modules directly, e.g. `from linearized_ellipsoid_intersections.fusion import
+# product_estimate`, or run the experiments with `lei run <name>` or
+# `python -m linearized_ellipsoid_intersections.<module>`.
@@ -0,0 +1,5 @@
+from .cli import main
+
+# `python -m linearized_ellipsoid_intersections ...` is the same as `lei ...`.
+
+main()
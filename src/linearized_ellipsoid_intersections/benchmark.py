@@ -0,0 +1,261 @@
+import itertools
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import time
+import torch
+from .spheres import intersect_spheres, multiply_spheres, reconstruct_from_distances_gradient
+from .fusion import generate_gaussians, mahalanobis_squared, fuse_scaled_gaussians
+from .ellipsoids import EllipsoidBank
+from .losses import SphericalLoss, EllipticalLoss, PrincipalComponentLoss, train_levenberg_marquardt
+from .solver import StoppingCriteria
+
+# Benchmark harness for the reconstruction and fusion hot paths.
+#
+# Every case builds its inputs for one point of its parameter grid and returns
+# a run() callable plus the number of inner operations one run performs. run()
+# is timed after warmup; the final error is measured on the last run. Results
+# for every grid point are written as JSON to results/benchmarks/ under the
+# working directory.
+
+# --- Settings ---
+device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+warmup = 1
+repeats = 5
+seed = 0
+
+# Parameter grids per case
+grids = {
+    'intersect_spheres':     {'D': [64, 784], 'N': [128, 1280]},
+    'multiply_spheres':      {'D': [64, 784], 'N': [128, 1280]},
+    'fuse_scaled_gaussians': {'D': [2, 16, 64], 'N': [3, 32], 'T': [1000]},
+    'spherical_loss':        {'D': [64, 784], 'k': [128, 1024]},
+    'elliptical_loss':       {'D': [64, 784], 'k': [128, 1024]},
+    'pca_loss':              {'D': [784], 'k': [1024], 'rank': [8, 32, 128]},
+    'gradient_descent':      {'D': [64, 784], 'k': [128, 1024], 'num_iters': [1000]},
+}
+
+# Iteration cap for the solve that measures final error in the loss cases
+solve_iters = 50
+
+
+def _sync():
+    if device.type == 'cuda':
+        torch.cuda.synchronize()
+
+
+def _reset_peak_rss():
+    """Reset the kernel's RSS high-water mark so it is measured per case (Linux)."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_bytes():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # Lifetime peak; KiB on Linux, bytes on macOS
+    scale = 1 if platform.system() == 'Darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+# --- Cases ---
+#
+# Each case takes its grid parameters and returns (run, ops, error):
+#   run:   callable performing the timed work, returning its output
+#   ops:   inner operations per run (intersections, trials, loss calls, steps)
+#   error: callable mapping run's output to the final reconstruction error
+
+def case_intersect_spheres(D, N):
+    x = torch.randn(D, device=device)
+    mus = 5 * torch.randn(N, D, device=device)
+    rs = torch.norm(x - mus, dim=1)
+
+    def run():
+        mu_x, r_x = mus[0], rs[0]
+        for i in range(1, N):
+            mu_next, r_next, isect = intersect_spheres(mu_x, r_x, mus[i], rs[i])
+            if isect > -1:
+                mu_x, r_x = mu_next, r_next
+        return mu_x
+
+    return run, N - 1, lambda mu: torch.norm(x - mu).item()
+
+
+def case_multiply_spheres(D, N):
+    x = torch.randn(D, device=device)
+    mus = 5 * torch.randn(N, D, device=device)
+    rs = torch.norm(x - mus, dim=1)
+
+    def run():
+        mu_x, r_x = mus[0], rs[0]
+        for i in range(1, N):
+            mu_x, r_x = multiply_spheres(mu_x, r_x, mus[i], rs[i])
+        return mu_x
+
+    return run, N - 1, lambda mu: torch.norm(x - mu).item()
+
+
+def case_fuse_scaled_gaussians(D, N, T):
+    x = torch.randn(T, D, device=device)
+    mus, Sigmas = generate_gaussians(T, N, D, device=device)
+    ys = mahalanobis_squared(x, mus, Sigmas)
+
+    def run():
+        return fuse_scaled_gaussians(mus, Sigmas, ys)[0]
+
+    return run, T, lambda mu: torch.norm(x - mu, dim=1).mean().item()
+
+
+def _loss_case(criterion, x_true, x_init):
+    """One loss and gradient evaluation per run; the error comes from a short LM solve."""
+    def run():
+        return criterion(x_init)
+
+    def error(_):
+        x_est = train_levenberg_marquardt(x_init.clone(), x_true, criterion, solve_iters, device,
+                                          criteria=StoppingCriteria(residual_tol=1e-6, check_every=1), verbose=False)
+        return torch.norm(x_true - x_est).item()
+
+    return run, 1, error
+
+
+def case_spherical_loss(D, k):
+    x_true, x_init = torch.randn(D, device=device), torch.randn(D, device=device)
+    mus = torch.randn(k, D, device=device)
+    return _loss_case(SphericalLoss(mus, torch.norm(x_true - mus, dim=1)), x_true, x_init)
+
+
+def case_elliptical_loss(D, k):
+    x_true, x_init = torch.randn(D, device=device), torch.randn(D, device=device)
+    bank = EllipsoidBank.random(k, D, device=device)
+    y = torch.sqrt(bank.mahalanobis_squared(x_true - bank.mus))
+    return _loss_case(EllipticalLoss(bank.mus, bank, y), x_true, x_init)
+
+
+def case_pca_loss(D, k, rank):
+    x_true, x_init = torch.randn(D, device=device), torch.randn(D, device=device)
+    bank = EllipsoidBank.random(k, D, device=device)
+    V, Lambda = bank.principal_components(rank)
+    proj = torch.einsum('krd,kd->kr', V, x_true - bank.mus) / Lambda.sqrt()
+    return _loss_case(PrincipalComponentLoss(bank.mus, V, Lambda, torch.norm(proj, dim=1)), x_true, x_init)
+
+
+def case_gradient_descent(D, k, num_iters):
+    x_true, x_init = torch.randn(D, device=device), torch.randn(D, device=device)
+    centroids = torch.randn(k, D, device=device)
+    y = torch.norm(x_true - centroids, dim=1)
+
+    def run():
+        return reconstruct_from_distances_gradient(x_init, y, centroids, num_iters=num_iters,
+                                                   learning_rate=1.0 / k, device=device)
+
+    return run, num_iters, lambda x_est: torch.norm(x_true - x_est).item()
+
+
+cases = {
+    'intersect_spheres': case_intersect_spheres,
+    'multiply_spheres': case_multiply_spheres,
+    'fuse_scaled_gaussians': case_fuse_scaled_gaussians,
+    'spherical_loss': case_spherical_loss,
+    'elliptical_loss': case_elliptical_loss,
+    'pca_loss': case_pca_loss,
+    'gradient_descent': case_gradient_descent,
+}
+
+
+def measure(name, params):
+    """Time one case at one grid point."""
+    torch.manual_seed(seed)
+    per_case_rss = _reset_peak_rss()
+    if device.type == 'cuda':
+        torch.cuda.reset_peak_memory_stats()
+
+    with torch.no_grad():
+        run, ops, error = cases[name](**params)
+        for _ in range(warmup):
+            run()
+        _sync()
+        latencies = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            out = run()
+            _sync()
+            latencies.append(time.perf_counter() - start)
+    final_error = error(out)
+
+    median = statistics.median(latencies)
+    record = {
+        'case': name,
+        'params': params,
+        'ops_per_run': ops,
+        'run_seconds': {'min': min(latencies), 'median': median, 'max': max(latencies)},
+        'op_seconds': median / ops,
+        'ops_per_second': ops / median,
+        'peak_rss_bytes': _peak_rss_bytes(),
+        'peak_rss_scope': 'case' if per_case_rss else 'process',
+        'final_error': final_error,
+    }
+    if device.type == 'cuda':
+        record['peak_cuda_bytes'] = torch.cuda.max_memory_allocated()
+    return record
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'torch': torch.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'device': str(device),
+        'threads': torch.get_num_threads(),
+        'warmup': warmup,
+        'repeats': repeats,
+        'seed': seed,
+    }
+
+
+def run_benchmarks(names=None, out_dir=None):
+    """Sweep the grids of the named cases (all by default) and write the records as JSON."""
+    names = names or list(cases)
+    records = []
+    for name in names:
+        keys = list(grids[name])
+        for values in itertools.product(*(grids[name][key] for key in keys)):
+            params = dict(zip(keys, values))
+            record = measure(name, params)
+            records.append(record)
+            print(f"{name} {params}: {record['op_seconds'] * 1e3:.3f} ms/op, "
+                  f"{record['ops_per_second']:.1f} ops/s, error {record['final_error']:.6f}, "
+                  f"peak RSS {record['peak_rss_bytes'] / 2**20:.0f} MiB")
+
+    # Relative to the working directory: an installed package has no results/ beside it
+    out_dir = out_dir or os.path.join('results', 'benchmarks')
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, time.strftime('benchmark-%Y%m%d-%H%M%S.json'))
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'records': records}, f, indent=2)
+    print(f"Wrote {path}")
+    return records
+
+
+if __name__ == '__main__':
+    print(f"Using device: {device}")
+    run_benchmarks()
@@ -0,0 +1,127 @@
+import argparse
+import importlib
+
+# Command-line entry point.
+#
+# Only argparse is imported here; each subcommand imports torch and the solver
+# modules when it runs, so `lei --help` and argument errors return without
+# paying for them.
+
+experiments = {
+    'ex1': 'ex1_2d',
+    'ex2': 'ex2_2d_pairwise',
+    'ex3': 'ex3_2d_increasing_N',
+    'ex4': 'ex4_nd_spherical',
+    'ex5': 'ex5_nd_spherical_increasing_N',
+    'ex6': 'ex6_nd_product',
+    'ex7': 'ex7_nd_sphere_inout',
+    'ex8': 'ex8_nd_sphere_inout_grad',
+    'ex9': 'ex9_nd_ellipsoid_inout',
+    'ex10': 'ex10_nd_ellipsoid_io_grad',
+    'ex11': 'ex11_manual_gradient_adam',
+    'ex12': 'ex12_pca',
+    'ex13': 'ex13_mnist_layer_inversion',
+    'eigenvalue': 'compare_error_to_mean_eigenvalue',
+}
+
+
+def run_experiment(args):
+    importlib.import_module('.' + experiments[args.name], __package__).main()
+
+
+def run_benchmark(args):
+    from . import benchmark
+    if args.repeats is not None:
+        benchmark.repeats = args.repeats
+    print(f"Using device: {benchmark.device}")
+    benchmark.run_benchmarks(args.cases or None, args.out)
+
+
+def make_bank(args):
+    import torch
+    from .ellipsoids import EllipsoidBank, save_bank
+    torch.manual_seed(args.seed)
+    save_bank(args.path, EllipsoidBank.random(args.k, args.D))
+    print(f"Wrote {args.path}")
+
+
+def reconstruct(args):
+    import torch
+    from .ellipsoids import EllipsoidBank, cached_random_bank
+    from .fusion import product_estimate
+    from .losses import EllipticalLoss, train_manual_adam, train_levenberg_marquardt
+    from .solver import StoppingCriteria
+
+    device = torch.device(args.device or ('cuda' if torch.cuda.is_available() else 'cpu'))
+    torch.manual_seed(args.seed)
+    if args.bank is not None:
+        bank = cached_random_bank(args.bank, args.k, args.D, device=device)
+    else:
+        bank = EllipsoidBank.random(args.k, args.D, device=device)
+
+    X_true = torch.randn(args.queries, args.D, device=device)
+    with torch.no_grad():
+        Y = torch.sqrt(bank.mahalanobis_squared(X_true.unsqueeze(1) - bank.mus))  # (B, k)
+    if args.warm_start:
+        X_est = product_estimate(bank.mus, bank, Y)
+    else:
+        X_est = torch.randn(args.queries, args.D, device=device)
+    print(f"Initial Error: {torch.norm(X_true - X_est, dim=1).mean().item():.6f}")
+
+    criterion = EllipticalLoss(bank.mus, bank, Y)
+    if args.method == 'lm':
+        criteria = StoppingCriteria(residual_tol=args.tol, check_every=1)
+        X_est = train_levenberg_marquardt(X_est, X_true, criterion, args.iters, device, label="LM",
+                                          inner=args.inner, criteria=criteria)
+    else:
+        criteria = StoppingCriteria(rel_loss_tol=1e-7, residual_tol=args.tol)
+        X_est = train_manual_adam(X_est, X_true, criterion, args.iters, 1.0 / args.k, device, label="Adam",
+                                  criteria=criteria, num_workers=args.workers)
+    print(f"Final Error: {torch.norm(X_true - X_est, dim=1).mean().item():.6f}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='lei', description="Linearized ellipsoid intersection experiments.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('run', help="run one of the experiment scripts")
+    p.add_argument('name', choices=list(experiments))
+    p.set_defaults(func=run_experiment)
+
+    p = commands.add_parser('benchmark', help="time the reconstruction and fusion paths")
+    p.add_argument('cases', nargs='*', help="cases to run (default: all)")
+    p.add_argument('--out', default=None, help="output directory for the JSON results (default: results/benchmarks)")
+    p.add_argument('--repeats', type=int, default=None)
+    p.set_defaults(func=run_benchmark)
+
+    p = commands.add_parser('bank', help="generate a random ellipsoid bank and save it for mapping")
+    p.add_argument('path')
+    p.add_argument('--k', type=int, default=1024)
+    p.add_argument('--D', type=int, default=784)
+    p.add_argument('--seed', type=int, default=0)
+    p.set_defaults(func=make_bank)
+
+    p = commands.add_parser('reconstruct', help="reconstruct random points from their Mahalanobis distances")
+    p.add_argument('--k', type=int, default=1024)
+    p.add_argument('--D', type=int, default=784)
+    p.add_argument('--queries', type=int, default=1)
+    p.add_argument('--bank', default=None, help="bank file to map (generated there if missing)")
+    p.add_argument('--method', choices=['adam', 'lm'], default='lm')
+    p.add_argument('--inner', choices=['cholesky', 'cg'], default='cholesky', help="LM inner solver")
+    p.add_argument('--iters', type=int, default=100)
+    p.add_argument('--tol', type=float, default=1e-6, help="relative residual tolerance")
+    p.add_argument('--warm-start', action='store_true', help="start from the product-of-Gaussians estimate")
+    p.add_argument('--workers', type=int, default=None, help="loss evaluation processes (Adam only)")
+    p.add_argument('--device', default=None)
+    p.add_argument('--seed', type=int, default=0)
+    p.set_defaults(func=reconstruct)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
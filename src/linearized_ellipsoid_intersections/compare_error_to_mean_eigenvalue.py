@@ -0,0 +1,36 @@
+import torch
+from .fusion2d import generate_gaussians_2d, mahalanobis_squared_2d, fuse_scaled_gaussians_2d
+
+
+def main():
+    # Set seed and options
+    torch.manual_seed(42)
+    torch.set_printoptions(precision=6, sci_mode=False)
+
+    # Parameters
+    num_trials = 100
+
+    # Closed-form 2x2 engine; draws the same Gaussians as fusion.generate_gaussians
+    x = torch.randn(num_trials, 2)
+    mus, Sigmas = generate_gaussians_2d(num_trials, 3)
+
+    # Compute Mahalanobis distances
+    ys = mahalanobis_squared_2d(x, mus, Sigmas)
+
+    # Scale and compute Gaussian product
+    mu_product, (sa, sb, sc) = fuse_scaled_gaussians_2d(mus, Sigmas, ys)
+
+    # Track errors; the mean eigenvalue of a 2x2 matrix is half its trace
+    errors = torch.norm(x - mu_product, dim=1)
+    mean_eigenvalue_sqrts = torch.sqrt(0.5 * (sa + sc))
+
+    # Final summary
+    avg_error = errors.mean().item()
+    avg_expected = mean_eigenvalue_sqrts.mean().item()
+
+    print(f"Average Euclidean error over {num_trials} runs: {avg_error:.6f}")
+    print(f"Average sqrt(mean eigenvalue) (expected error): {avg_expected:.6f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,409 @@
+import copy
+import os
+import torch
+from .generators import wishart_cholesky, haar_householder, apply_householder, spectrum
+from .tensorfile import write_tensors, read_tensors
+
+def _rhs(diffs, start, end):
+    """(k, D) or (B, k, D) diffs -> (c, D, m) right-hand sides for ellipsoids [start, end)."""
+    if diffs.dim() == 2:
+        return diffs[start:end].unsqueeze(-1)
+    return diffs[:, start:end].permute(1, 2, 0)
+
+
+def _unrhs(X, diffs):
+    """Inverse of _rhs: (c, n, m) -> (c, n) or (m, c, n)."""
+    if diffs.dim() == 2:
+        return X.squeeze(-1)
+    return X.permute(2, 0, 1)
+
+
+class EllipsoidBank:
+    # Per-ellipsoid tensors, gathered by subset()
+    _indexed = ('mus', 'packed_L')
+
+    def __init__(self, mus, packed_L, chunk_size=64):
+        """
+        A bank of k ellipsoids (mu_i, Sigma_i) stored as means plus the packed
+        lower triangle of each Cholesky factor Sigma_i = L_i L_i^T.
+
+        A packed factor holds D(D+1)/2 values, about half of one dense (D, D)
+        matrix, and replaces As, Sigmas and inv_Sigmas. Mahalanobis distances
+        and gradients are computed with triangular solves; factors are unpacked
+        chunk_size at a time, so no dense (k, D, D) tensor is ever formed.
+
+        Args:
+            mus:        (k, D)          - ellipsoid centers
+            packed_L:   (k, D(D+1)/2)   - row-major packed lower Cholesky factors
+            chunk_size: number of factors unpacked at once
+        """
+        self.mus = mus
+        self.packed_L = packed_L
+        self.chunk_size = chunk_size
+        self.k, self.D = mus.shape
+        self.rows, self.cols = torch.tril_indices(self.D, self.D, device=mus.device)
+
+    @classmethod
+    def from_covariances(cls, mus, Sigmas, chunk_size=64):
+        """Factor and pack dense (k, D, D) covariances."""
+        k, D = mus.shape
+        rows, cols = torch.tril_indices(D, D, device=mus.device)
+        packed_L = torch.empty(k, rows.shape[0], device=mus.device, dtype=mus.dtype)
+        for start in range(0, k, chunk_size):
+            end = min(start + chunk_size, k)
+            L = torch.linalg.cholesky(Sigmas[start:end])
+            packed_L[start:end] = L[:, rows, cols]
+        return cls(mus, packed_L, chunk_size)
+
+    @classmethod
+    def random(cls, k, D, device='cpu', chunk_size=64):
+        """
+        Same distribution as the experiment generators: mu ~ N(0, I) and
+        Sigma = A A^T + 0.5 I with A ~ N(0, I), generated and factored in chunks.
+        """
+        mus = torch.randn(k, D, device=device)
+        rows, cols = torch.tril_indices(D, D, device=device)
+        packed_L = torch.empty(k, rows.shape[0], device=device)
+        eye = torch.eye(D, device=device)
+        for start in range(0, k, chunk_size):
+            end = min(start + chunk_size, k)
+            A = torch.randn(end - start, D, D, device=device)
+            Sigmas = torch.matmul(A, A.transpose(-1, -2)) + 0.5 * eye
+            packed_L[start:end] = torch.linalg.cholesky(Sigmas)[:, rows, cols]
+        return cls(mus, packed_L, chunk_size)
+
+    @classmethod
+    def wishart(cls, k, D, df=None, ridge=0.0, device='cpu', chunk_size=64):
+        """
+        Sigma ~ Wishart(I, df) + ridge I, sampled as its Cholesky factor via
+        the Bartlett decomposition.
+
+        With ridge = 0 there is no A A^T product and no factorization, but the
+        distribution is not that of random(): without the ridge the smallest
+        eigenvalues come close to zero. ridge = 0.5 (with df = D) matches
+        random() exactly, at the cost of refactoring T T^T + ridge I.
+        """
+        mus = torch.randn(k, D, device=device)
+        rows, cols = torch.tril_indices(D, D, device=device)
+        packed_L = torch.empty(k, rows.shape[0], device=device)
+        eye = torch.eye(D, device=device)
+        for start in range(0, k, chunk_size):
+            end = min(start + chunk_size, k)
+            T = wishart_cholesky(end - start, D, df, device=device)
+            if ridge:
+                T = torch.linalg.cholesky(torch.matmul(T, T.transpose(-1, -2)) + ridge * eye)
+            packed_L[start:end] = T[:, rows, cols]
+        return cls(mus, packed_L, chunk_size)
+
+    def __len__(self):
+        return self.k
+
+    def nbytes(self):
+        return self.mus.element_size() * self.mus.nelement() \
+            + self.packed_L.element_size() * self.packed_L.nelement()
+
+    def subset(self, idx):
+        """
+        Bank restricted to the ellipsoids idx, in that order.
+
+        Only the per-ellipsoid tensors are gathered (O(b D^2) for b indices);
+        everything else is shared with this bank. A slice keeps views instead.
+        """
+        sub = copy.copy(self)
+        for name in self._indexed:
+            t = getattr(self, name)
+            setattr(sub, name, t[idx] if isinstance(idx, slice) else t[idx.to(t.device)])
+        sub.k = sub.mus.shape[0]
+        return sub
+
+    def chunks(self):
+        for start in range(0, self.k, self.chunk_size):
+            yield start, min(start + self.chunk_size, self.k)
+
+    def factors(self, start, end):
+        """Dense Cholesky factors L_i for i in [start, end): (c, D, D)."""
+        L = torch.zeros(end - start, self.D, self.D, device=self.packed_L.device, dtype=self.packed_L.dtype)
+        L[:, self.rows, self.cols] = self.packed_L[start:end]
+        return L
+
+    def covariances(self, start, end):
+        """Dense covariances Sigma_i = L_i L_i^T for i in [start, end): (c, D, D)."""
+        L = self.factors(start, end)
+        return torch.matmul(L, L.transpose(-1, -2))
+
+    def covariance_factors(self, start, end):
+        """Factors F_i and shift s with Sigma_i = F_i F_i^T + s I for i in [start, end)."""
+        return self.factors(start, end), 0.0
+
+    def apply_precision(self, start, end, rhs):
+        """Sigma_i^-1 rhs_i for i in [start, end), rhs (c, D, m): two triangular solves, O(D^2 m) each."""
+        return torch.cholesky_solve(rhs, self.factors(start, end))
+
+    def weighted_precision(self, w, V):
+        """
+        sum_i w_bi Sigma_i^-1 v_b for every query b, without forming any Sigma_i^-1.
+
+        Args:
+            w: (B, k) - weights
+            V: (B, D) - vectors
+
+        Returns:
+            (B, D)
+        """
+        out = torch.zeros_like(V)
+        for start, end in self.chunks():
+            rhs = V.T.unsqueeze(0).expand(end - start, -1, -1).contiguous()  # (c, D, B)
+            out += torch.einsum('bc,cdb->bd', w[:, start:end], self.apply_precision(start, end, rhs))
+        return out
+
+    def mahalanobis_squared(self, diffs):
+        """
+        Args:
+            diffs: (k, D) - x - mu_i for every ellipsoid, or (B, k, D) for B
+                   queries; each factor is then read once for all B queries
+
+        Returns:
+            d2: (k,) or (B, k) - diffs_i^T Sigma_i^-1 diffs_i
+        """
+        d2 = []
+        for start, end in self.chunks():
+            L = self.factors(start, end)
+            z = torch.linalg.solve_triangular(L, _rhs(diffs, start, end), upper=False)
+            d2.append(_unrhs(z.pow(2).sum(-2, keepdim=True), diffs).squeeze(-1))
+        return torch.cat(d2, dim=diffs.dim() - 2)
+
+    def mahalanobis_grad(self, diffs):
+        """
+        Squared Mahalanobis distances and precision-weighted diffs.
+
+        Args:
+            diffs: (k, D) - x - mu_i for every ellipsoid, or (B, k, D) for B queries
+
+        Returns:
+            d2:         (k,) or (B, k)      - diffs_i^T Sigma_i^-1 diffs_i
+            prec_diffs: (k, D) or (B, k, D) - Sigma_i^-1 diffs_i (half the gradient of d2)
+        """
+        d2, prec_diffs = [], []
+        for start, end in self.chunks():
+            L = self.factors(start, end)
+            z = torch.linalg.solve_triangular(L, _rhs(diffs, start, end), upper=False)
+            g = torch.linalg.solve_triangular(L.transpose(-1, -2), z, upper=True)
+            d2.append(_unrhs(z.pow(2).sum(-2, keepdim=True), diffs).squeeze(-1))
+            prec_diffs.append(_unrhs(g, diffs))
+        dim = diffs.dim() - 2
+        return torch.cat(d2, dim=dim), torch.cat(prec_diffs, dim=dim)
+
+    def principal_components(self, r):
+        """
+        Top r eigenpairs of every covariance, computed chunk by chunk.
+
+        Returns:
+            V:      (k, r, D) - top principal components, largest first
+            Lambda: (k, r)    - corresponding eigenvalues
+        """
+        V, Lambda = [], []
+        for start, end in self.chunks():
+            eigvals, eigvecs = torch.linalg.eigh(self.covariances(start, end))  # ascending
+            Lambda.append(eigvals[:, -r:].flip(-1))
+            V.append(eigvecs[:, :, -r:].flip(-1).transpose(-1, -2))
+        return torch.cat(V), torch.cat(Lambda)
+
+
+class ProceduralEllipsoidBank(EllipsoidBank):
+    _indexed = ('mus', 'ids')
+
+    def __init__(self, k, D, seed=0, device='cpu', chunk_size=64):
+        """
+        Lazy EllipsoidBank: ellipsoid i is rebuilt from (seed, i) whenever a
+        chunk containing it is needed, and no factors are stored at all.
+
+        Each A_i is drawn from its own generator seeded by (seed, i), so the
+        bank is identical for every chunk_size and evaluation order. Every pass
+        recomputes A A^T + 0.5 I and its Cholesky factor chunk by chunk, trading
+        O(D^3) work per ellipsoid for O(k D) resident memory.
+
+        Args:
+            k:          number of ellipsoids
+            D:          dimensionality
+            seed:       bank seed
+            chunk_size: number of ellipsoids rebuilt at once
+        """
+        self.seed = seed
+        self.device = torch.device(device)
+        self.k, self.D = k, D
+        self.chunk_size = chunk_size
+        self.packed_L = None
+        self.mus = torch.randn(k, D, generator=self._generator(-1), device=self.device)
+        self.ids = torch.arange(k)  # generator index of every ellipsoid
+        self.eye = torch.eye(D, device=self.device)
+
+    def _generator(self, i):
+        g = torch.Generator(device=self.device)
+        g.manual_seed((self.seed * 0x9E3779B1 + i + 1) % (1 << 63))
+        return g
+
+    def nbytes(self):
+        return self.mus.element_size() * self.mus.nelement()
+
+    def _draw_A(self, start, end):
+        return torch.stack([
+            torch.randn(self.D, self.D, generator=self._generator(i), device=self.device)
+            for i in self.ids[start:end].tolist()
+        ])
+
+    def covariance_factors(self, start, end):
+        return self._draw_A(start, end), 0.5
+
+    def covariances(self, start, end):
+        A = self._draw_A(start, end)
+        return torch.matmul(A, A.transpose(-1, -2)) + 0.5 * self.eye
+
+    def factors(self, start, end):
+        return torch.linalg.cholesky(self.covariances(start, end))
+
+
+class SpectralEllipsoidBank(EllipsoidBank):
+    _indexed = ('mus', 'packed_V', 'tau', 'signs', 'eigvals')
+
+    def __init__(self, mus, packed_V, tau, signs, eigvals, chunk_size=64):
+        """
+        EllipsoidBank with Sigma_i = Q_i diag(lambda_i) Q_i^T, where each random
+        orthogonal Q_i is stored as packed Householder reflectors.
+
+        Q_i^T and Q_i are applied with ormqr in O(D^2) per vector, so distances
+        and gradients need no factorization, and the top-r principal components
+        are read off directly since lambda_i is sorted largest first.
+
+        Args:
+            mus:      (k, D)          - ellipsoid centers
+            packed_V: (k, D(D-1)/2)   - packed strictly-lower Householder reflectors
+            tau:      (k, D)          - reflector scales
+            signs:    (k, D)          - column signs of Q
+            eigvals:  (k, D)          - eigenvalues, largest first
+        """
+        self.mus = mus
+        self.packed_V = packed_V
+        self.packed_L = None
+        self.tau = tau
+        self.signs = signs
+        self.eigvals = eigvals
+        self.chunk_size = chunk_size
+        self.k, self.D = mus.shape
+        self.rows, self.cols = torch.tril_indices(self.D, self.D, offset=-1, device=mus.device)
+
+    @classmethod
+    def random(cls, k, D, profile='geometric', condition=100.0, scale=1.0, device='cpu', chunk_size=64):
+        """Random orthogonal bases with a fixed eigenvalue profile (see generators.spectrum)."""
+        mus = torch.randn(k, D, device=device)
+        rows, cols = torch.tril_indices(D, D, offset=-1, device=device)
+        packed_V = torch.empty(k, rows.shape[0], device=device)
+        tau = torch.empty(k, D, device=device)
+        signs = torch.empty(k, D, device=device)
+        for start in range(0, k, chunk_size):
+            end = min(start + chunk_size, k)
+            V, tau[start:end], signs[start:end] = haar_householder(end - start, D, device=device)
+            packed_V[start:end] = V[:, rows, cols]
+        eigvals = spectrum(k, D, profile, condition, scale, device=device)
+        return cls(mus, packed_V, tau, signs, eigvals, chunk_size)
+
+    def nbytes(self):
+        return sum(t.element_size() * t.nelement() for t in (self.mus, self.packed_V, self.tau, self.signs, self.eigvals))
+
+    def reflectors(self, start, end):
+        V = torch.zeros(end - start, self.D, self.D, device=self.packed_V.device, dtype=self.packed_V.dtype)
+        V[:, self.rows, self.cols] = self.packed_V[start:end]
+        return V, self.tau[start:end], self.signs[start:end]
+
+    def covariance_factors(self, start, end):
+        V, tau, signs = self.reflectors(start, end)
+        eye = torch.eye(self.D, device=V.device, dtype=V.dtype).expand_as(V)
+        Q = apply_householder(V, tau, signs, eye)
+        return Q * self.eigvals[start:end].sqrt().unsqueeze(-2), 0.0
+
+    def covariances(self, start, end):
+        F, _ = self.covariance_factors(start, end)
+        return torch.matmul(F, F.transpose(-1, -2))
+
+    def apply_precision(self, start, end, rhs):
+        V, tau, signs = self.reflectors(start, end)
+        z = apply_householder(V, tau, signs, rhs, transpose=True)
+        return apply_householder(V, tau, signs, z / self.eigvals[start:end].unsqueeze(-1))
+
+    def factors(self, start, end):
+        return torch.linalg.cholesky(self.covariances(start, end))
+
+    def mahalanobis_squared(self, diffs):
+        return self.mahalanobis_grad(diffs)[0]
+
+    def mahalanobis_grad(self, diffs):
+        d2, prec_diffs = [], []
+        for start, end in self.chunks():
+            V, tau, signs = self.reflectors(start, end)
+            lam = self.eigvals[start:end].unsqueeze(-1)
+            z = apply_householder(V, tau, signs, _rhs(diffs, start, end), transpose=True)  # Q^T diff
+            d2.append(_unrhs((z.pow(2) / lam).sum(-2, keepdim=True), diffs).squeeze(-1))
+            prec_diffs.append(_unrhs(apply_householder(V, tau, signs, z / lam), diffs))
+        dim = diffs.dim() - 2
+        return torch.cat(d2, dim=dim), torch.cat(prec_diffs, dim=dim)
+
+    def principal_components(self, r):
+        V_out = []
+        for start, end in self.chunks():
+            V, tau, signs = self.reflectors(start, end)
+            E = torch.eye(self.D, r, device=V.device, dtype=V.dtype).expand(end - start, self.D, r)
+            V_out.append(apply_householder(V, tau, signs, E).transpose(-1, -2))
+        return torch.cat(V_out), self.eigvals[:, :r]
+
+
+# --- On-disk bank format ---
+#
+# A tensorfile (see tensorfile.py) holding 'mus', 'packed_L' and any extra
+# arrays, with k, D and the common dtype in the header. open_bank maps the
+# whole file once and hands out zero-copy views.
+
+BANK_MAGIC = b'ELLBANK\0'
+BANK_VERSION = 1
+
+
+def save_bank(path, bank, **extras):
+    """
+    Write an EllipsoidBank (means and packed factors) plus optional extra
+    arrays of the same dtype, e.g. precisions or eigen-decompositions, to path.
+
+    The file is written under a temporary name in the same directory and
+    renamed into place, so a concurrent open_bank never maps a partial file.
+    """
+    if getattr(bank, 'packed_L', None) is None:
+        raise TypeError(f"save_bank writes packed Cholesky factors; {type(bank).__name__} stores none")
+    arrays = {'mus': bank.mus, 'packed_L': bank.packed_L, **extras}
+    dtype = bank.mus.dtype
+    for name, t in arrays.items():
+        if t.dtype != dtype:
+            raise ValueError(f"array '{name}' has dtype {t.dtype}, expected {dtype}")
+    write_tensors(path, BANK_MAGIC, BANK_VERSION, arrays,
+                  dtype=str(dtype).replace('torch.', ''), k=bank.k, D=bank.D)
+
+
+def open_bank(path, device='cpu', chunk_size=64):
+    """
+    Map a bank written by save_bank.
+
+    Returns:
+        bank:   EllipsoidBank whose tensors are views of the mapped file
+                (copied only if device is not the CPU)
+        extras: dict of the remaining arrays
+    """
+    arrays, _ = read_tensors(path, BANK_MAGIC, BANK_VERSION)
+    arrays = {name: t.to(device) for name, t in arrays.items()}
+    bank = EllipsoidBank(arrays.pop('mus'), arrays.pop('packed_L'), chunk_size)
+    return bank, arrays
+
+
+def cached_random_bank(path, k, D, device='cpu', chunk_size=64):
+    """Open the bank at path, or generate EllipsoidBank.random and save it there first."""
+    if not os.path.exists(path):
+        save_bank(path, EllipsoidBank.random(k, D, device=device, chunk_size=chunk_size))
+    bank, _ = open_bank(path, device=device, chunk_size=chunk_size)
+    if (bank.k, bank.D) != (k, D):
+        raise ValueError(f"{path} holds k={bank.k}, D={bank.D}; expected k={k}, D={D}")
+    return bank
@@ -0,0 +1,116 @@
+import torch
+from torch.optim import SGD
+from .putils import Timer
+from .ellipsoids import EllipsoidBank, cached_random_bank
+from .losses import SphericalIntersectionLoss, EllipticalIntersectionLoss
+from .solver import StoppingCriteria, solve
+from .fusion import product_estimate
+
+def train(model, x_true, criterion, optimizer, num_iters, lr, device, criteria=None):
+    timer = Timer()
+    with torch.no_grad():
+        initial_error = torch.norm(x_true - model).item()
+
+    # --- Training Loop ---
+    def step(X, state, t, rows):
+        optimizer.zero_grad()
+        loss = criterion(model)
+        loss.backward()
+        optimizer.step()
+        return model.detach().view(1, -1), loss.detach().view(1), model.grad.view(1, -1)
+
+    final, iterations = solve(model.detach(), step, num_iters, criteria, y=criterion.y.view(-1), x_true=x_true)
+
+    # --- Final Result ---
+    with torch.no_grad():
+        final_error = torch.norm(x_true - model).item()
+
+    print(f"Elapsed Time: {timer.tick():.2f}s")
+    print(f"Iterations: {iterations.item()}")
+    print(f"\nInitial Error: {initial_error:.6f}")
+    print(f"  Final Error: {final_error:.6f}")
+    return iterations
+
+
+def main():
+    # --- Device Selection ---
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    print(f"Using device: {device}")
+
+    # --- Experiment Setup ---
+    D = 784
+    k = 1024
+    num_iters = 10000
+    lr = 1.0 / k
+
+    # Set to a file path to map a saved bank instead of regenerating it every run
+    bank_path = None
+
+    # num_iters is a cap; stop once the loss stalls or the residuals are small
+    stopping = StoppingCriteria(rel_loss_tol=1e-7, residual_tol=1e-5)
+
+    # torch.manual_seed(42)  # Optional reproducibility
+
+    # --- Generate Ground Truth and Ellipsoids ---
+    x_true = torch.randn(D, device=device)
+    x_init = torch.randn(D, device=device)
+
+    print("Generating ellipsoids...")
+    if bank_path is not None:
+        bank = cached_random_bank(bank_path, k, D, device=device)
+    else:
+        bank = EllipsoidBank.random(k, D, device=device)
+    mus = bank.mus
+
+    # Compute target Mahalanobis distances
+    with torch.no_grad():
+        diffs_true = x_true - mus
+        y = torch.sqrt(bank.mahalanobis_squared(diffs_true))
+        y.requires_grad_(False)
+
+    model = torch.nn.Parameter(x_init.clone().detach()).to(device)
+    criterion = EllipticalIntersectionLoss(mus, bank, y)
+    # optimizer = SGD([model], lr=lr)
+    optimizer = torch.optim.Adam([model], lr=lr)
+    print("----- Ellipsoidal Gradient Descent Reconstruction -----")
+    print(f"D={D}, k={k}, num_iters={num_iters}, lr={lr}, opt={type(optimizer)}")
+    cold_iters = train(model, x_true, criterion, optimizer, num_iters, lr, device, criteria=stopping)
+
+    print()
+
+    # Start from the product-of-scaled-Gaussians estimate instead of x_init
+    model = torch.nn.Parameter(product_estimate(mus, bank, y).detach()).to(device)
+    criterion = EllipticalIntersectionLoss(mus, bank, y)
+    optimizer = torch.optim.Adam([model], lr=lr)
+    print("----- Warm-started Ellipsoidal Gradient Descent Reconstruction -----")
+    warm_iters = train(model, x_true, criterion, optimizer, num_iters, lr, device, criteria=stopping)
+    print(f"Iterations saved by warm start: {(cold_iters - warm_iters).item()}")
+
+    print()
+
+    # Compute target L2 distances
+    with torch.no_grad():
+        diffs_true = x_true - mus
+        y = torch.norm(diffs_true, dim=1)
+        y.requires_grad_(False)
+
+    model = torch.nn.Parameter(x_init.clone().detach()).to(device)
+    criterion = SphericalIntersectionLoss(mus, y)
+    # optimizer = SGD([model], lr=lr)
+    optimizer = torch.optim.Adam([model], lr=lr)
+    print("----- Spherical Gradient Descent Reconstruction -----")
+    print(f"D={D}, k={k}, num_iters={num_iters}, lr={lr}, opt={type(optimizer)}")
+    cold_iters = train(model, x_true, criterion, optimizer, num_iters, lr, device, criteria=stopping)
+
+    print()
+
+    model = torch.nn.Parameter(product_estimate(mus, None, y).detach()).to(device)
+    criterion = SphericalIntersectionLoss(mus, y)
+    optimizer = torch.optim.Adam([model], lr=lr)
+    print("----- Warm-started Spherical Gradient Descent Reconstruction -----")
+    warm_iters = train(model, x_true, criterion, optimizer, num_iters, lr, device, criteria=stopping)
+    print(f"Iterations saved by warm start: {(cold_iters - warm_iters).item()}")
+
+
+if __name__ == '__main__':
+    main()
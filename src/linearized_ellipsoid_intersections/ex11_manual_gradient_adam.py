@@ -0,0 +1,175 @@
+import torch
+from .putils import Timer, profiler
+from .spheres import multilaterate
+from .fusion import product_estimate
+from .ellipsoids import EllipsoidBank, cached_random_bank, ProceduralEllipsoidBank
+from .solver import StoppingCriteria
+from .losses import train_manual_adam, train_levenberg_marquardt, SphericalLoss, EllipticalLoss
+
+
+def main():
+    # --- Setup ---
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    print(f"Using device: {device}")
+
+    D = 784
+    k = 1024
+    num_iters = 10000
+    lr = 1.0 / k
+
+    # num_iters is a cap; each query stops once its loss stalls or its residuals are small
+    stopping = StoppingCriteria(rel_loss_tol=1e-7, residual_tol=1e-5)
+
+    # Set to a file path to map a saved bank instead of regenerating it every run
+    bank_path = None
+
+    # Rebuild each ellipsoid from (seed, i) on every pass instead of storing
+    # factors; memory stays O(k D) at the cost of recomputation.
+    procedural = False
+
+    # Independent queries reconstructed together against the same bank
+    num_queries = 16
+
+    # Levenberg-Marquardt: iteration cap, inner solver ('cholesky' or 'cg') and
+    # stopping rule, checked every iteration since each one is a full solve
+    lm_iters = 100
+    lm_inner = 'cholesky'
+    lm_stopping = StoppingCriteria(residual_tol=1e-6, grad_tol=1e-8, check_every=1)
+
+    # Constraints evaluated per step (None = all k) and how they are drawn:
+    # 'uniform', 'epoch' or 'importance'. lr is scaled by the batch fraction.
+    constraint_batch = None
+    sampling = 'uniform'
+
+    # Worker processes for sharded loss evaluation (CPU, full batch only), e.g.
+    # one per socket; None evaluates everything in this process
+    num_workers = None
+
+    # Profile setup and solver phases; prints a section table and writes a Chrome trace
+    profile = False
+    trace_path = 'ex11_manual_gradient_adam_trace.json'
+    profiler.enabled = profile
+    profiler.memory = 'cuda' if device.type == 'cuda' else 'rss'
+
+    # torch.manual_seed(42)
+
+    x_true = torch.randn(D, device=device)
+    x_init = torch.randn(D, device=device)
+
+    # -- Generate ellipsoids --
+    with profiler.section("Creating random means and covariance factors"):
+        if procedural:
+            bank = ProceduralEllipsoidBank(k, D, seed=0, device=device, chunk_size=64)
+        elif bank_path is not None:
+            bank = cached_random_bank(bank_path, k, D, device=device)
+        else:
+            bank = EllipsoidBank.random(k, D, device=device)
+        mus = bank.mus
+
+    with torch.no_grad(), profiler.section("Evaluating targets"):
+        diffs = x_true - mus
+        y_ellip = torch.sqrt(bank.mahalanobis_squared(diffs))
+        y_sphere = torch.norm(diffs, dim=1)
+
+    # --- Ellipsoidal Reconstruction ---
+    print("----- Ellipsoidal Manual Adam Reconstruction -----")
+    x_est = x_init.clone().detach()
+    criterion = EllipticalLoss(mus, bank, y_ellip)
+    with profiler.section("Elliptical"):
+        x_est, cold_iters = train_manual_adam(x_est, x_true, criterion, num_iters, lr, device, label="Elliptical",
+                                              batch_size=constraint_batch, sampling=sampling, criteria=stopping,
+                                              return_iterations=True)
+
+    print()
+
+    # --- Warm-started Ellipsoidal Reconstruction ---
+    print("----- Warm-started Ellipsoidal Manual Adam Reconstruction -----")
+    timer = Timer()
+    with profiler.section("Product estimate"):
+        x_warm = product_estimate(mus, bank, y_ellip)
+    print(f"Product Estimate Time: {timer.tick():.2f}s")
+    print(f"Product Estimate Error: {torch.norm(x_true - x_warm).item():.6f}")
+    criterion = EllipticalLoss(mus, bank, y_ellip)
+    with profiler.section("Warm Elliptical"):
+        x_est, warm_iters = train_manual_adam(x_warm, x_true, criterion, num_iters, lr, device, label="Warm Elliptical",
+                                              batch_size=constraint_batch, sampling=sampling, criteria=stopping,
+                                              return_iterations=True)
+    print(f"Iterations saved by warm start: {(cold_iters - warm_iters).item()}")
+
+    print()
+
+    # --- Ellipsoidal Levenberg-Marquardt Reconstruction ---
+    print("----- Ellipsoidal Levenberg-Marquardt Reconstruction -----")
+    x_est = x_init.clone().detach()
+    criterion = EllipticalLoss(mus, bank, y_ellip)
+    with profiler.section("Elliptical LM"):
+        x_est = train_levenberg_marquardt(x_est, x_true, criterion, lm_iters, device, label="Elliptical LM",
+                                          inner=lm_inner, criteria=lm_stopping)
+
+    print()
+
+    # --- Spherical Reconstruction ---
+    print("----- Spherical Manual Adam Reconstruction -----")
+    x_est = x_init.clone().detach()
+    criterion = SphericalLoss(mus, y_sphere)
+    with profiler.section("Spherical"):
+        x_est, cold_iters = train_manual_adam(x_est, x_true, criterion, num_iters, lr, device, label="Spherical",
+                                              batch_size=constraint_batch, sampling=sampling, criteria=stopping,
+                                              return_iterations=True)
+
+    print()
+
+    # --- Warm-started Spherical Reconstruction ---
+    print("----- Warm-started Spherical Manual Adam Reconstruction -----")
+    x_warm = product_estimate(mus, None, y_sphere)
+    print(f"Product Estimate Error: {torch.norm(x_true - x_warm).item():.6f}")
+    criterion = SphericalLoss(mus, y_sphere)
+    with profiler.section("Warm Spherical"):
+        x_est, warm_iters = train_manual_adam(x_warm, x_true, criterion, num_iters, lr, device, label="Warm Spherical",
+                                              batch_size=constraint_batch, sampling=sampling, criteria=stopping,
+                                              return_iterations=True)
+    print(f"Iterations saved by warm start: {(cold_iters - warm_iters).item()}")
+
+    print()
+
+    # --- Spherical Levenberg-Marquardt Reconstruction ---
+    print("----- Spherical Levenberg-Marquardt Reconstruction -----")
+    x_est = x_init.clone().detach()
+    criterion = SphericalLoss(mus, y_sphere)
+    with profiler.section("Spherical LM"):
+        x_est = train_levenberg_marquardt(x_est, x_true, criterion, lm_iters, device, label="Spherical LM",
+                                          inner=lm_inner, criteria=lm_stopping)
+
+    print()
+
+    # --- Spherical One-shot Multilateration ---
+    print("----- Spherical Linear Multilateration -----")
+    timer = Timer()
+    with profiler.section("Multilateration"):
+        x_ml, r_ml = multilaterate(mus, y_sphere)
+    print(f"Multilateration Time: {timer.tick():.2f}s")
+    print(f"Multilateration Expected Error: {r_ml.item():.6f}")
+    print(f"Multilateration Final Error: {torch.norm(x_true - x_ml).item():.6f}")
+
+    print()
+
+    # --- Batched Ellipsoidal Reconstruction ---
+    print(f"----- Batched Ellipsoidal Manual Adam Reconstruction ({num_queries} queries) -----")
+    X_true = torch.randn(num_queries, D, device=device)
+    X_est = torch.randn(num_queries, D, device=device)
+    with torch.no_grad():
+        Y_ellip = torch.sqrt(bank.mahalanobis_squared(X_true.unsqueeze(1) - mus))  # (B, k)
+    criterion = EllipticalLoss(mus, bank, Y_ellip)
+    with profiler.section("Batched Elliptical"):
+        X_est = train_manual_adam(X_est, X_true, criterion, num_iters, lr, device, label="Batched Elliptical", criteria=stopping,
+                                  num_workers=num_workers)
+
+    if profile:
+        print()
+        print(profiler.report())
+        profiler.export_chrome_trace(trace_path)
+        print(f"Wrote {trace_path}")
+
+
+if __name__ == '__main__':
+    main()
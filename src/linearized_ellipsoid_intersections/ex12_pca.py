@@ -0,0 +1,178 @@
+import torch
+from .putils import Timer, profiler
+from .ellipsoids import EllipsoidBank, SpectralEllipsoidBank, cached_random_bank
+from .fusion import product_estimate
+from .pca import PCACache, randomized_principal_components
+from .solver import StoppingCriteria
+from .losses import train_manual_adam, train_levenberg_marquardt, SphericalLoss, EllipticalLoss, PrincipalComponentLoss
+
+
+def main():
+    # --- Setup ---
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    print(f"Using device: {device}")
+
+    D = 784
+    k = 1024
+    num_iters = 10000
+    lr = 1.0 / k
+    n_pca = 32
+
+    # num_iters is a cap; each query stops once its loss stalls or its residuals are small
+    stopping = StoppingCriteria(rel_loss_tol=1e-7, residual_tol=1e-5)
+
+    # Levenberg-Marquardt: iteration cap, inner solver ('cholesky' or 'cg') and
+    # stopping rule, checked every iteration since each one is a full solve
+    lm_iters = 100
+    lm_inner = 'cg'
+    lm_stopping = StoppingCriteria(residual_tol=1e-6, grad_tol=1e-8, check_every=1)
+
+    # Set to a file path to map a saved bank instead of regenerating it every run
+    bank_path = None
+
+    # 'dense' (A A^T + 0.5 I), 'wishart' (Bartlett-sampled Cholesky factors of
+    # A A^T, without the ridge) or 'spectral' (random Householder basis with a
+    # geometric eigenvalue profile)
+    covariance_sampler = 'dense'
+
+    # Set to a directory to cache PCA eigenpairs across runs and n_pca values
+    pca_cache_dir = None
+
+    # 'eigh' for the full decomposition, 'randomized' for randomized subspace
+    # iteration. The A A^T + 0.5 I spectrum is flat, so the randomized solver
+    # converges slowly here and falls back to eigh for chunks it cannot resolve.
+    pca_solver = 'eigh'
+
+    # Profile setup and solver phases; prints a section table and writes a Chrome trace
+    profile = False
+    trace_path = 'ex12_pca_trace.json'
+    profiler.enabled = profile
+    profiler.memory = 'cuda' if device.type == 'cuda' else 'rss'
+
+    print(f"D={D}, k={k}, num_iters={num_iters}, lr={lr}, n_pca={n_pca}, ")
+
+    torch.manual_seed(42)
+
+    x_true = torch.randn(D, device=device)
+    x_init = torch.randn(D, device=device)
+
+    # -- Generate ellipsoids --
+    print("Generating data")
+    with torch.no_grad():
+        setup_timer = Timer()
+        print("\tCreating random means and covariance factors")
+        with profiler.section("Creating random means and covariance factors"):
+            if bank_path is not None:
+                bank = cached_random_bank(bank_path, k, D, device=device)
+            elif covariance_sampler == 'wishart':
+                bank = EllipsoidBank.wishart(k, D, device=device)
+            elif covariance_sampler == 'spectral':
+                bank = SpectralEllipsoidBank.random(k, D, condition=100.0, device=device)
+            else:
+                bank = EllipsoidBank.random(k, D, device=device)
+            mus = bank.mus
+
+        # Precompute PCA components
+        print("\tPCA covariances")
+        with profiler.section("PCA covariances"):
+            if pca_cache_dir is not None:
+                pca_cache = PCACache(pca_cache_dir, store_rank=4 * n_pca, solver=pca_solver)
+                top_V, top_Lambda = pca_cache.principal_components(bank, n_pca)  # (k, r, D), (k, r)
+            elif pca_solver == 'randomized':
+                top_V, top_Lambda, residuals = randomized_principal_components(bank, n_pca)
+                print(f"\tMax eigenpair residual: {residuals.max().item():.2e}")
+            else:
+                top_V, top_Lambda = bank.principal_components(n_pca)  # (k, r, D), (k, r)
+
+    print(f"\tDone ({setup_timer.tick():.2f}s)")
+
+    print("Evaluating initial state")
+    with torch.no_grad(), profiler.section("Evaluating initial state"):
+        diffs = x_true - mus
+        y_ellip = torch.sqrt(bank.mahalanobis_squared(diffs))
+        y_sphere = torch.norm(diffs, dim=1)
+        proj = torch.einsum('krd,kd->kr', top_V, diffs)           # (k, r)
+        scaled = proj / (top_Lambda.sqrt() + 1e-8)                # (k, r)
+        y_pca_l2 = torch.norm(scaled, dim=1)                      # (k,)
+        y_pca_l1 = torch.sum(scaled.abs(), dim=1)  # (k,)
+    print(f"\tDone ({setup_timer.tick():.2f}s)")
+
+    # --- PCA L2 Reconstruction ---
+    print("----- PCA L2 Manual Adam Reconstruction -----")
+    x_est = x_init.clone().detach()
+    criterion = PrincipalComponentLoss(mus, top_V, top_Lambda, y_pca_l2, norm_type='l2')
+    with profiler.section("PCA-L2"):
+        x_est = train_manual_adam(x_est, x_true, criterion, num_iters, lr, device, label="PCA-L2", criteria=stopping)
+
+    print()
+
+    # --- PCA L2 Levenberg-Marquardt Reconstruction ---
+    print("----- PCA L2 Levenberg-Marquardt Reconstruction -----")
+    x_est = x_init.clone().detach()
+    criterion = PrincipalComponentLoss(mus, top_V, top_Lambda, y_pca_l2, norm_type='l2')
+    with profiler.section("PCA-L2 LM"):
+        x_est = train_levenberg_marquardt(x_est, x_true, criterion, lm_iters, device, label="PCA-L2 LM",
+                                          inner=lm_inner, criteria=lm_stopping)
+
+    print()
+
+    # --- PCA L1 Reconstruction ---
+    print("----- PCA L1 Manual Adam Reconstruction -----")
+    x_est = x_init.clone().detach()
+    criterion = PrincipalComponentLoss(mus, top_V, top_Lambda, y_pca_l1, norm_type='l1')
+    with profiler.section("PCA-L1"):
+        x_est = train_manual_adam(x_est, x_true, criterion, num_iters, lr, device, label="PCA-L1", criteria=stopping)
+
+    print()
+
+    # --- Ellipsoidal Reconstruction ---
+    print("----- Ellipsoidal Manual Adam Reconstruction -----")
+    x_est = x_init.clone().detach()
+    criterion = EllipticalLoss(mus, bank, y_ellip)
+    with profiler.section("Elliptical"):
+        x_est, cold_iters = train_manual_adam(x_est, x_true, criterion, num_iters, lr, device, label="Elliptical",
+                                              criteria=stopping, return_iterations=True)
+
+    print()
+
+    # --- Warm-started Ellipsoidal Reconstruction ---
+    print("----- Warm-started Ellipsoidal Manual Adam Reconstruction -----")
+    timer = Timer()
+    with profiler.section("Product estimate"):
+        x_warm = product_estimate(mus, bank, y_ellip)
+    print(f"Product Estimate Time: {timer.tick():.2f}s")
+    print(f"Product Estimate Error: {torch.norm(x_true - x_warm).item():.6f}")
+    criterion = EllipticalLoss(mus, bank, y_ellip)
+    with profiler.section("Warm Elliptical"):
+        x_est, warm_iters = train_manual_adam(x_warm, x_true, criterion, num_iters, lr, device, label="Warm Elliptical",
+                                              criteria=stopping, return_iterations=True)
+    print(f"Iterations saved by warm start: {(cold_iters - warm_iters).item()}")
+
+    print()
+
+    # --- Ellipsoidal Levenberg-Marquardt Reconstruction ---
+    print("----- Ellipsoidal Levenberg-Marquardt Reconstruction -----")
+    x_est = x_init.clone().detach()
+    criterion = EllipticalLoss(mus, bank, y_ellip)
+    with profiler.section("Elliptical LM"):
+        x_est = train_levenberg_marquardt(x_est, x_true, criterion, lm_iters, device, label="Elliptical LM",
+                                          inner=lm_inner, criteria=lm_stopping)
+
+    print()
+
+    # --- Spherical Reconstruction ---
+    print("----- Spherical Manual Adam Reconstruction -----")
+    x_est = x_init.clone().detach()
+    criterion = SphericalLoss(mus, y_sphere)
+    with profiler.section("Spherical"):
+        x_est = train_manual_adam(x_est, x_true, criterion, num_iters, lr, device, label="Spherical", criteria=stopping)
+
+    if profile:
+        print()
+        print(profiler.report())
+        profiler.export_chrome_trace(trace_path)
+        print(f"Wrote {trace_path}")
+
+
+if __name__ == '__main__':
+    main()
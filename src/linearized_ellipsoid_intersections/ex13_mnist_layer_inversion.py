@@ -0,0 +1,52 @@
+import torch
+from .putils import Timer, Abs, MLP2, load_mnist, train_supervised, evaluate_model
+from .inversion import invert_layer, format_class_report
+
+
+def main():
+    # --- Setup ---
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    print(f"Using device: {device}")
+    torch.manual_seed(42)
+
+    # Dataset location; the flattened tensors are cached under it after the first run
+    data_root = 'e:/ml_datasets'
+
+    # First-layer width. With at least D = 784 units the layer outputs pin
+    # down the input up to the sign ambiguity of |.|.
+    hidden = 1024
+    activation = Abs()
+
+    # Supervised training
+    train_updates = 5000
+    train_batch = 512
+    lr = 0.01
+
+    # Compiled forward, fused/foreach SGD and device-side loss accumulation;
+    # set False on platforms without a torch.compile backend
+    fast_training = True
+
+    # Inversion: inputs per chunk (the Jacobian of a chunk is
+    # inversion_batch * hidden * 784 floats) and LM settings
+    inversion_batch = 256
+    lm_iters = 50
+    lm_inner = 'cg'
+
+    # --- Train the classifier ---
+    train_sampler, test_sampler, input_dim = load_mnist(root=data_root, batch_size=train_batch, device=device)
+    model = MLP2(input_dim, hidden, 10, activation=activation).to(device)
+    train_supervised(model, train_sampler, 10, num_epochs=train_updates, lr=lr, device=device, fast=fast_training)
+    print(f"Test accuracy: {100 * evaluate_model(model, test_sampler, batch_size=4096, device=device):.2f}%")
+
+    print()
+
+    # --- Invert the first layer over the test set ---
+    print(f"----- First-Layer Inversion ({hidden} units, {test_sampler.num_samples} inputs) -----")
+    timer = Timer()
+    stats = invert_layer(model, test_sampler, device, batch_size=inversion_batch, num_iters=lm_iters, inner=lm_inner)
+    print(f"Inversion Time: {timer.tick():.2f}s")
+    print(format_class_report(stats))
+
+
+if __name__ == '__main__':
+    main()
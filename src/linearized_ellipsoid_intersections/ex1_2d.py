@@ -0,0 +1,79 @@
+import torch
+from .fusion2d import eigvals_2x2, mahalanobis_squared_2d, fuse_scaled_gaussians_2d
+
+# Step 2: Define 3 anisotropic Gaussians
+def generate_gaussian(mean_shift):
+    mu = torch.randn(2) + mean_shift
+    A = torch.randn(2, 2)
+    Sigma = A @ A.T + 0.5 * torch.eye(2)
+    return mu, Sigma
+
+
+def main():
+    # Set seed
+    torch.manual_seed(42)
+    torch.set_printoptions(precision=6, sci_mode=False)
+
+    log = []
+
+    # Step 1: Sample true input
+    x = torch.randn(2)
+    log.append(f"Sampled true x: {x.tolist()}")
+
+    gaussians = [generate_gaussian(i * 2.0) for i in range(3)]
+
+    # Closed-form 2x2 form: means (1, N, 2), covariance components (1, N) each
+    mus = torch.stack([mu for mu, _ in gaussians]).unsqueeze(0)
+    Sigmas = tuple(torch.stack([Sigma[i, j] for _, Sigma in gaussians]).unsqueeze(0) for i, j in ((0, 0), (0, 1), (1, 1)))
+
+    # Step 3: Compute Mahalanobis distances
+    # (closed-form 2x2 inverse, no torch.inverse)
+    ys = mahalanobis_squared_2d(x.unsqueeze(0), mus, Sigmas)   # (1, N)
+    log.append("\nComputing Mahalanobis distances:")
+    for i, (mu, Sigma) in enumerate(gaussians):
+        log.append(f"  Gaussian {i+1}:")
+        log.append(f"    mu = {mu.tolist()}")
+        log.append(f"    Sigma = {Sigma}")
+        log.append(f"    y (Mahalanobis^2) = {ys[0, i].item():.4f}")
+
+    # Step 4: Scale the covariances and fuse the first i + 1 of them
+    log.append("\nScaling covariances:")
+    for i, (mu, Sigma) in enumerate(gaussians):
+        log.append(f"  Gaussian {i+1}:")
+        scaled_Sigma = ys[0, i] * Sigma
+        running, (sa, sb, sc) = fuse_scaled_gaussians_2d(mus[:, :i + 1], tuple(t[:, :i + 1] for t in Sigmas), ys[:, :i + 1])
+        log.append(f"    Scaled Sigma: {scaled_Sigma}")
+        log.append(f"    Running estimate: {running[0].tolist()}")
+        log.append(f"    Running expected error: {torch.sqrt(0.5 * (sa + sc))[0].item():.6f}")
+
+    # Step 5: Compute Gaussian product
+    mu_product, (sa, sb, sc) = fuse_scaled_gaussians_2d(mus, Sigmas, ys)
+    mu_product = mu_product[0]
+    Sigma_product = torch.stack([torch.cat([sa, sb]), torch.cat([sb, sc])])
+
+    # Step 6: Report reconstruction
+    error = torch.norm(x - mu_product)
+    log.append("\n--- Product Gaussian Result ---")
+    log.append(f"Reconstructed x̂ (mean of product): {mu_product.tolist()}")
+    log.append(f"True x: {x.tolist()}")
+    log.append(f"Euclidean error ||x - x̂||: {error.item():.6f}")
+
+    # Step 7: Analyze product covariance
+    eigvals = torch.cat(eigvals_2x2(sa, sb, sc))
+    sqrt_max = eigvals.max().sqrt().item()
+    sqrt_mean = eigvals.mean().sqrt().item()
+    sphericity = (eigvals.prod().sqrt() / eigvals.mean()).item()
+
+    log.append("\n--- Covariance Diagnostics ---")
+    log.append(f"Product covariance matrix:\n{Sigma_product}")
+    log.append(f"Eigenvalues: {eigvals.tolist()}")
+    log.append(f"√(max eigenvalue) (Max error): {sqrt_max:.6f}")
+    log.append(f"√(mean eigenvalue) (Expected error): {sqrt_mean:.6f}")
+    log.append(f"Sphericity (geometric / arithmetic mean): {sphericity:.6f}")
+
+    # Output the log
+    print("\n".join(log))
+
+
+if __name__ == '__main__':
+    main()
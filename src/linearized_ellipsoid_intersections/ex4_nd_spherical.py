@@ -0,0 +1,30 @@
+import torch
+from .spheres import intersect_spheres
+
+
+def main():
+    # Set seed for reproducibility
+    # torch.manual_seed(42)
+    torch.set_printoptions(precision=6, sci_mode=False)
+
+    N = 128000
+    D = 784
+    print(f"Intersecting {N} spheres across {D} dimensions")
+
+    x = torch.randn(D)
+    mu_x = 5*torch.randn(D)
+    r_x = torch.norm(x - mu_x)
+    print(f"0: Expected Error: {r_x:.8f}, Observed Error: {torch.norm(x - mu_x):.8f}")
+    for i in range(1, N):
+        mu_i = 5*torch.randn(D)
+        r_i = torch.norm(x - mu_i)
+        mu_next, r_next, isect = intersect_spheres(mu_x, r_x, mu_i, r_i)
+        if isect > -1:
+            mu_x, r_x = mu_next, r_next
+        else:
+            print(f"{i} No intersection")
+        print(f"{i}: Expected Error: {r_x:.8f}, Observed Error: {torch.norm(x - mu_x):.8f}")
+
+
+if __name__ == '__main__':
+    main()
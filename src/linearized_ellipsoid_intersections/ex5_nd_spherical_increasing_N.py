@@ -0,0 +1,54 @@
+import torch
+from .spheres import intersect_spheres_batched, multilaterate
+
+
+def main():
+    # Set seed for reproducibility
+    torch.manual_seed(42)
+    torch.set_printoptions(precision=6, sci_mode=False)
+
+    n_spheres = 30
+    n_dims = 100
+    num_trials = 1000
+    print(f"Intersecting {n_spheres} spheres across {n_dims} dimensions with {num_trials} trials")
+
+    # Run for N from 2 to 10
+    for N in range(2, n_spheres+1):
+        # Sample one true point x per trial
+        x = torch.randn(num_trials, n_dims)
+
+        # Generate N sphere constraints per trial: centers and radii
+        shifts = 2.0 * torch.arange(N, dtype=torch.float32).view(1, N, 1)
+        centers = torch.randn(num_trials, N, n_dims) + shifts  # (T, N, D)
+        radii = torch.norm(x.unsqueeze(1) - centers, dim=-1)   # (T, N)
+
+        # Initialize intersection
+        mu_intersect, r_intersect = centers[:, 0], radii[:, 0]
+
+        # Iteratively intersect with remaining spheres, all trials at once.
+        # Trials whose pair does not intersect keep their previous sphere.
+        for i in range(1, N):
+            _, mu_intersect, r_intersect, _ = intersect_spheres_batched(
+                mu_intersect, r_intersect, centers[:, i], radii[:, i]
+            )
+
+        # Estimated x̂ is the final intersection center
+        x_hat = mu_intersect
+        errors = torch.norm(x - x_hat, dim=1)
+        expected_errors = r_intersect
+
+        avg_error = errors.mean().item()
+        avg_expected_error = expected_errors.mean().item()
+
+        print(f"N = {N}")
+        print(f"  Avg Euclidean error ||x - x̂||: {avg_error:.6f}")
+        print(f"  Avg expected error (intersection radius): {avg_expected_error:.6f}")
+
+        # One-shot linear multilateration of the same constraints
+        x_lin, r_lin = multilaterate(centers, radii)
+        print(f"  Multilateration error ||x - x̂||: {torch.norm(x - x_lin, dim=1).mean().item():.6f}")
+        print(f"  Multilateration expected error (intersection radius): {r_lin.mean().item():.6f}\n")
+
+
+if __name__ == '__main__':
+    main()
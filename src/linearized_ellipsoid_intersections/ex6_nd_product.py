@@ -0,0 +1,34 @@
+import torch
+from .spheres import multiply_spheres
+
+
+def main():
+    # Set seed for reproducibility
+    # torch.manual_seed(42)
+    torch.set_printoptions(precision=6, sci_mode=False)
+
+    # Configuration
+    N = 1280
+    D = 784
+    print(f"Intersecting {N} spheres across {D} dimensions")
+
+    # Step 1: Sample true point
+    x = torch.randn(D)
+
+    # Step 2: Sample initial center and radius
+    mu_x = 5 * torch.randn(D)
+    r_x = torch.norm(x - mu_x)
+    print(f"0: Expected Error: {r_x:.8f}, Observed Error: {torch.norm(x - mu_x):.8f}")
+
+    # Step 3: Iteratively intersect with new spheres
+    for i in range(1, N):
+        mu_i = 5 * torch.randn(D)
+        r_i = torch.norm(x - mu_i)
+
+        mu_x, r_x = multiply_spheres(mu_x, r_x, mu_i, r_i)
+
+        print(f"{i}: Expected Error: {r_x:.8f}, Observed Error: {torch.norm(x - mu_x):.8f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import torch
+from .putils import Timer
+from .spheres import multilaterate, reconstruct_from_distances_gradient
+from .solver import StoppingCriteria
+
+def reconstruct_from_distances(x_init, y, centroids, num_iters=100, step_fraction=1.0, device='cpu', x_true=None):
+    """
+    Original distance-based reconstruction, vectorized. x_true, if given, is
+    used only for progress logging.
+    """
+    k, D = centroids.shape
+    x_est = x_init.clone().detach().to(device)
+    centroids = centroids.to(device)
+    y = y.to(device)  # Ensure y is on the correct device
+
+    for _ in range(num_iters):
+        # Vectorized calculations
+        diffs = x_est - centroids  # (k, D) - (D,) broadcasts to (k, D)
+        d_est = torch.norm(diffs, dim=1, keepdim=True)  # (k, 1)
+        d_true = y.view(-1,1) #Reshape y for broadcasting
+        direction = diffs / (d_est + 1e-8)  # (k, D)
+        delta = d_true - d_est  # (k, 1)
+        x_est = x_est + step_fraction * torch.sum(delta * direction, dim=0)
+
+        if x_true is not None and (_ + 1) % 1000 == 0:
+            error = torch.norm(x_true - x_est)
+            print(f"Original (Vectorized) Iteration {(_ + 1)}: Error = {error.item()}")
+
+    return x_est
+
+
+def main():
+    # --- Device Selection (CPU or GPU) ---
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    print(f"Using device: {device}")
+
+    # Experiment Setup (D=784, k=128)
+    D = 784
+    k = 1024 
+    num_iters = 10000  # Increased iterations
+    lr = 1.0 / k
+
+    # num_iters is a cap; stop once the loss stalls or the residuals are small
+    stopping = StoppingCriteria(rel_loss_tol=1e-7, residual_tol=1e-5)
+
+    # Generate random centroids and true x
+    centroids = torch.randn(k, D, device=device)
+    x_true = torch.randn(D, device=device)
+    x_init = torch.randn(D, device=device)
+
+    # Calculate distances (y)
+    y = torch.tensor([torch.norm(x_true - centroids[i]) for i in range(k)])
+
+    # --- Gradient Descent Reconstruction ---
+    print("----- Gradient Descent Reconstruction -----")
+    timer = Timer()
+    x_est_gd = reconstruct_from_distances_gradient(x_init, y, centroids, num_iters=num_iters, learning_rate=lr, device=device,
+                                                   criteria=stopping, x_true=x_true)
+    gd_error = torch.norm(x_true - x_est_gd)
+    print(f"{timer.tick():.2f}s")
+
+    # --- One-shot Linear Multilateration ---
+    print("----- Linear Multilateration Reconstruction -----")
+    x_est_ml, r_ml = multilaterate(centroids, y.to(device))
+    ml_error = torch.norm(x_true - x_est_ml)
+    print(f"{timer.tick():.2f}s")
+
+    # # --- Original Algorithm Reconstruction ---
+    # print("\n----- Original Algorithm Reconstruction -----")
+    # x_est_orig = reconstruct_from_distances(x_init, y, centroids, num_iters=num_iters, step_fraction=lr, device=device, x_true=x_true)
+    # orig_error = torch.norm(x_true - x_est_orig)
+
+    print(f"Initial Error: {torch.norm(x_true - x_init)}")
+    print(f"Final GD Error: {gd_error.item()}")
+    print(f"Multilateration Expected Error: {r_ml.item()}")
+    print(f"Final Multilateration Error: {ml_error.item()}")
+    # print(f"Final Original Error: {orig_error.item()}")
+
+    # Linear Scaling Rule (Goyal et al., 2017) - when you increase the batch size by a factor of n, you should also increase the learning rate by a factor of n. It keeps the variance of the updates roughly constant.
+    # We are doing the opposite.
+
+    # The key here is that the variance of the gradient estimate scales inversely with the batch size, but the magnitude of the full gradient scales linearly with the batch size.
+
+
+if __name__ == '__main__':
+    main()
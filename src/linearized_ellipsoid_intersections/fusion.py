@@ -0,0 +1,381 @@
+import torch
+from .solver import conjugate_gradient
+
+# Batched Gaussian-product fusion.
+#
+# Every tensor carries a leading trial dimension T so that a whole error-vs-N
+# sweep is a handful of batched linear algebra calls instead of thousands of
+# Python-level inverses.
+
+def generate_gaussians(num_trials, N, dim, mean_shift=2.0, device='cpu'):
+    """
+    Batched version of the generate_gaussian helper used by the 2D experiments.
+
+    Gaussian i of every trial has its mean shifted by i * mean_shift and a
+    random anisotropic covariance A @ A.T + 0.5 * I.
+
+    Returns:
+        mus:    (T, N, D) - Gaussian means
+        Sigmas: (T, N, D, D) - Gaussian covariances
+    """
+    shifts = mean_shift * torch.arange(N, device=device, dtype=torch.float32).view(1, N, 1)
+    mus = torch.randn(num_trials, N, dim, device=device) + shifts
+    A = torch.randn(num_trials, N, dim, dim, device=device)
+    Sigmas = A @ A.transpose(-1, -2) + 0.5 * torch.eye(dim, device=device)
+    return mus, Sigmas
+
+
+def mahalanobis_squared(x, mus, Sigmas):
+    """
+    Squared Mahalanobis distance of each trial's x to each of its Gaussians.
+
+    Args:
+        x:      (T, D)       - true points
+        mus:    (T, N, D)    - Gaussian means
+        Sigmas: (T, N, D, D) - Gaussian covariances
+
+    Returns:
+        ys: (T, N) - (x - mu)^T Sigma^-1 (x - mu)
+    """
+    L = torch.linalg.cholesky(Sigmas)
+    delta = (x.unsqueeze(1) - mus).unsqueeze(-1)  # (T, N, D, 1)
+    z = torch.linalg.solve_triangular(L, delta, upper=False)
+    return z.squeeze(-1).pow(2).sum(-1)
+
+
+def fuse_scaled_gaussians(mus, Sigmas, ys):
+    """
+    Product of the scaled Gaussians N(mu_i, y_i * Sigma_i) for a batch of trials.
+
+    Each Gaussian is scaled so the true point lies on its unit Mahalanobis
+    shell, then all N are fused in information form:
+
+        Lambda = sum_i Sigma_i^-1 / y_i
+        eta    = sum_i Sigma_i^-1 mu_i / y_i
+        mu_product = Lambda^-1 eta, Sigma_product = Lambda^-1
+
+    All inverses are replaced by Cholesky solves.
+
+    Args:
+        mus:    (T, N, D)    - Gaussian means
+        Sigmas: (T, N, D, D) - Gaussian covariances
+        ys:     (T, N)       - squared Mahalanobis distances of the true point
+
+    Returns:
+        mu_product:    (T, D)    - mean of the product Gaussian (the estimate x̂)
+        Sigma_product: (T, D, D) - covariance of the product Gaussian
+    """
+    D = mus.shape[-1]
+    eye = torch.eye(D, device=mus.device, dtype=mus.dtype)
+
+    L = torch.linalg.cholesky(Sigmas)                              # (T, N, D, D)
+    inv_Sigmas = torch.cholesky_solve(eye.expand_as(Sigmas), L)    # (T, N, D, D)
+    inv_mus = torch.cholesky_solve(mus.unsqueeze(-1), L)           # (T, N, D, 1)
+
+    scale = 1.0 / ys
+    precision = torch.sum(inv_Sigmas * scale[..., None, None], dim=1)  # (T, D, D)
+    eta = torch.sum(inv_mus * scale[..., None, None], dim=1)           # (T, D, 1)
+
+    L_product = torch.linalg.cholesky(precision)
+    mu_product = torch.cholesky_solve(eta, L_product).squeeze(-1)
+    Sigma_product = torch.cholesky_solve(eye.expand_as(precision), L_product)
+    return mu_product, Sigma_product
+
+
+def expected_error(Sigma_product):
+    """
+    sqrt(mean eigenvalue) of the product covariance, i.e. sqrt(trace / D).
+
+    Args:
+        Sigma_product: (..., D, D)
+
+    Returns:
+        (...,) expected reconstruction error
+    """
+    return torch.diagonal(Sigma_product, dim1=-2, dim2=-1).mean(-1).sqrt()
+
+
+def product_estimate(mus, precisions, y, chunk_size=64, cg_iters=50, cg_tol=1e-4):
+    """
+    Product-of-scaled-Gaussians estimate of x from target distances.
+
+    Target y_i puts x on the unit shell of N(mu_i, y_i^2 Sigma_i); as in
+    fuse_scaled_gaussians the product is the solution of the information-form
+    system
+
+        Lambda x = eta,  Lambda = sum_i Sigma_i^-1 / y_i^2,  eta = sum_i Sigma_i^-1 mu_i / y_i^2.
+
+    For a bank, no precision is ever formed: eta takes one solve against each
+    mean, and Lambda x = eta is solved by conjugate gradient from the
+    spherical estimate, where each product Lambda v costs two triangular solves
+    per ellipsoid, O(k D^2) per query, instead of the O(k D^3) of inverting
+    every factor. Used to warm start the iterative solvers, so a loose cg_tol
+    is enough.
+
+    Args:
+        mus:        (k, D)         - ellipsoid centers
+        precisions: EllipsoidBank, dense (k, D, D) precisions, or None for
+                    spheres (Sigma_i = I)
+        y:          (k,) or (B, k) - target distances
+        cg_iters:   conjugate gradient iterations (banks only)
+        cg_tol:     relative residual tolerance (banks only)
+
+    Returns:
+        x_hat: (D,) or (B, D)
+    """
+    k, D = mus.shape
+    w = 1.0 / y.view(-1, k).pow(2)                                   # (B, k)
+    x_sphere = (w @ mus) / w.sum(1, keepdim=True)
+    if precisions is None:
+        return x_sphere.view(*y.shape[:-1], D)
+
+    if not isinstance(precisions, torch.Tensor):
+        _, prec_mus = precisions.mahalanobis_grad(mus)               # (k, D) Sigma_i^-1 mu_i
+        eta = w @ prec_mus                                           # (B, D)
+
+        def matvec(v):
+            return precisions.weighted_precision(w, v)
+
+        x_hat = x_sphere + conjugate_gradient(matvec, eta - matvec(x_sphere), iters=cg_iters, tol=cg_tol)
+        return x_hat.view(*y.shape[:-1], D)
+
+    B = w.shape[0]
+    precision = torch.zeros(B, D, D, device=mus.device, dtype=mus.dtype)
+    eta = torch.zeros(B, D, device=mus.device, dtype=mus.dtype)
+    for start in range(0, k, chunk_size):
+        end = min(start + chunk_size, k)
+        P = precisions[start:end]
+        P_mus = torch.matmul(P, mus[start:end].unsqueeze(-1)).squeeze(-1)  # (c, D)
+        precision += torch.einsum('bc,cij->bij', w[:, start:end], P)
+        eta += w[:, start:end] @ P_mus
+
+    L = torch.linalg.cholesky(precision)
+    x_hat = torch.cholesky_solve(eta.unsqueeze(-1), L).squeeze(-1)
+    return x_hat.view(*y.shape[:-1], D)
+
+
+def _as_dense(Sigma, D):
+    if Sigma.dim() == 0:
+        return Sigma * torch.eye(D, device=Sigma.device, dtype=Sigma.dtype)
+    if Sigma.dim() == 1:
+        return torch.diag(Sigma)
+    return Sigma
+
+
+def gaussian_product(mu1, Sigma1, mu2, Sigma2):
+    """
+    Product of two Gaussians N(mu1, Sigma1) and N(mu2, Sigma2).
+
+    A covariance may be given as a scalar variance (isotropic, Sigma = s * I),
+    a (D,) vector (diagonal) or a dense (D, D) matrix. When neither is dense the
+    product is elementwise and costs O(D):
+
+        Sigma_p = S1 S2 / (S1 + S2),  mu_p = (S2 mu1 + S1 mu2) / (S1 + S2)
+
+    Only an anisotropic dense covariance falls back to the matrix path, which
+    uses a single Cholesky factorization of Sigma1 + Sigma2.
+
+    Returns:
+        mu_product:    (D,)
+        Sigma_product: scalar, (D,) or (D, D), the narrowest form of the inputs
+    """
+    Sigma1 = torch.as_tensor(Sigma1, dtype=mu1.dtype, device=mu1.device)
+    Sigma2 = torch.as_tensor(Sigma2, dtype=mu1.dtype, device=mu1.device)
+
+    if Sigma1.dim() < 2 and Sigma2.dim() < 2:
+        total = Sigma1 + Sigma2
+        Sigma_p = Sigma1 * Sigma2 / total
+        mu_p = (Sigma2 * mu1 + Sigma1 * mu2) / total
+        return mu_p, Sigma_p
+
+    D = mu1.shape[-1]
+    Sigma1 = _as_dense(Sigma1, D)
+    Sigma2 = _as_dense(Sigma2, D)
+
+    # (S1^-1 + S2^-1)^-1 = S1 (S1 + S2)^-1 S2
+    L = torch.linalg.cholesky(Sigma1 + Sigma2)
+    Sigma_p = Sigma1 @ torch.cholesky_solve(Sigma2, L)
+    mu_p = Sigma2 @ torch.cholesky_solve(mu1.unsqueeze(-1), L).squeeze(-1) \
+        + Sigma1 @ torch.cholesky_solve(mu2.unsqueeze(-1), L).squeeze(-1)
+    return mu_p, Sigma_p
+
+
+def mean_variance(Sigma):
+    """Mean eigenvalue of a scalar, diagonal or dense covariance."""
+    if Sigma.dim() == 0:
+        return Sigma
+    if Sigma.dim() == 1:
+        return Sigma.mean()
+    return torch.diagonal(Sigma, dim1=-2, dim2=-1).mean(-1)
+
+
+def cholesky_rank_one(L, v, sign=1.0):
+    """
+    Cholesky factor of L L^T + sign * v v^T in O(D^2).
+
+    Uses L' = L M with M = chol(I + sign * p p^T), p = L^-1 v. M has the closed
+    form M_jj = sqrt(b_j / b_{j-1}), M_ij = sign * p_i p_j / sqrt(b_{j-1} b_j)
+    for i > j, where b_j = 1 + sign * sum_{k<=j} p_k^2, so L M reduces to suffix
+    sums over the columns of L and no D x D product is formed.
+
+    Args:
+        L:    (D, D) lower Cholesky factor
+        v:    (D,)   update vector
+        sign: +1.0 for an update, -1.0 for a downdate
+
+    Returns:
+        L_new: (D, D) updated factor
+        p:     (D,)   L^-1 v
+        beta:  scalar tensor, 1 + sign * ||p||^2 (must stay positive on downdates)
+    """
+    p = torch.linalg.solve_triangular(L, v.unsqueeze(-1), upper=False).squeeze(-1)
+    beta = 1.0 + sign * torch.cumsum(p * p, dim=0)
+    beta_prev = torch.cat([beta.new_ones(1), beta[:-1]])
+    d = torch.sqrt(beta / beta_prev)
+    q = sign * p / torch.sqrt(beta_prev * beta)
+
+    # S[:, j] = sum_{k > j} L[:, k] p_k
+    suffix = torch.flip(torch.cumsum(torch.flip(L * p, dims=[1]), dim=1), dims=[1])
+    S = torch.zeros_like(L)
+    S[:, :-1] = suffix[:, 1:]
+
+    return L * d + S * q, p, beta[-1]
+
+
+class InformationAccumulator:
+    def __init__(self, D, prior_precision=0.0, device=None, dtype=None, refactor_fraction=0.125):
+        """
+        Running Gaussian product in information form.
+
+        Holds the summed precision Lambda, the precision-weighted mean eta, the
+        Cholesky factor of Lambda and trace(Lambda^-1). Constraints given as a
+        low-rank precision factor are folded in with Cholesky rank updates, so
+        the current mean and expected error can be read after every constraint
+        in O(D^2). A factor with more than refactor_fraction * D columns, such
+        as the D x D factor of a dense covariance, is added to Lambda and
+        refactored once instead: one O(D^3 / 3) Cholesky beats D sequential
+        rank-one updates of about 3 D^2 flops each.
+
+        Args:
+            D:                 dimensionality
+            prior_precision:   isotropic prior precision; 0 means no prior, in
+                               which case the factor exists once Lambda is full rank
+            device, dtype:     storage of the running sums; None takes them from
+                               the first constraint added
+            refactor_fraction: rank above which an addition refactors, as a
+                               fraction of D
+        """
+        self.D = D
+        self.prior_precision = prior_precision
+        self.refactor_fraction = refactor_fraction
+        self.precision = None   # (D, D)
+        self.eta = None         # (D,)
+        self.L = None
+        self.trace_cov = None
+        if device is not None or dtype is not None:
+            self._allocate(torch.device(device or 'cpu'), dtype or torch.get_default_dtype())
+
+    def _allocate(self, device, dtype):
+        D, prior = self.D, self.prior_precision
+        self.precision = prior * torch.eye(D, device=device, dtype=dtype)
+        self.eta = torch.zeros(D, device=device, dtype=dtype)
+        if prior > 0:
+            self.L = (prior ** 0.5) * torch.eye(D, device=device, dtype=dtype)
+            self.trace_cov = torch.tensor(D / prior, device=device, dtype=dtype)
+
+    def _factorize(self, precision):
+        """(L, trace(Lambda^-1)) of precision, or None if it is not positive definite."""
+        L, info = torch.linalg.cholesky_ex(precision)
+        if info.item() != 0:
+            return None
+        eye = torch.eye(self.D, device=L.device, dtype=L.dtype)
+        L_inv = torch.linalg.solve_triangular(L, eye, upper=False)
+        return L, torch.sum(L_inv ** 2)
+
+    def add_factor(self, mu, W, y=1.0, sign=1.0):
+        """
+        Fold in N(mu, y * Sigma) where Sigma^-1 = W W^T.
+
+        Args:
+            mu: (D,)   mean
+            W:  (D, r) precision factor; r rank-one updates, O(r D^2), or one
+                       O(D^3) refactorization when r > refactor_fraction * D
+            y:  scale of the covariance (squared Mahalanobis distance)
+            sign: +1.0 to add the constraint, -1.0 to remove it
+
+        Raises:
+            ValueError: if a downdate would leave Lambda indefinite; the
+                        accumulator is left unchanged
+        """
+        if self.precision is None:
+            self._allocate(mu.device, mu.dtype)
+        W = W.reshape(self.D, -1).to(self.precision) / (y ** 0.5)
+        mu = mu.to(self.precision)
+        precision = self.precision + sign * (W @ W.T)
+        eta = self.eta + sign * (W @ (W.T @ mu))
+
+        # Compute the new factor first so a failed downdate leaves every field as it was
+        if self.L is None or W.shape[1] > self.refactor_fraction * self.D:
+            factored = self._factorize(precision)
+            if factored is None and sign < 0 and self.L is not None:
+                raise ValueError("downdate would make the precision indefinite; "
+                                 "was this constraint added with the same mu, W and y?")
+            L, trace_cov = factored if factored is not None else (None, None)
+        else:
+            L, trace_cov = self.L, self.trace_cov
+            for j in range(W.shape[1]):
+                L_new, p, beta = cholesky_rank_one(L, W[:, j], sign)
+                if sign < 0 and beta.item() <= 0:
+                    raise ValueError("downdate would make the precision indefinite; "
+                                     "was this constraint added with the same mu, W and y?")
+                # Sherman-Morrison on the trace of the covariance:
+                # tr((Lambda + s v v^T)^-1) = tr(Lambda^-1) - s ||Lambda^-1 v||^2 / (1 + s ||L^-1 v||^2)
+                w = torch.linalg.solve_triangular(L.T, p.unsqueeze(-1), upper=True).squeeze(-1)
+                trace_cov = trace_cov - sign * torch.dot(w, w) / beta
+                L = L_new
+
+        self.precision, self.eta = precision, eta
+        self.L, self.trace_cov = L, trace_cov
+
+    def remove_factor(self, mu, W, y=1.0):
+        """Remove a constraint previously added with add_factor (rank downdate)."""
+        self.add_factor(mu, W, y, sign=-1.0)
+
+    def add(self, mu, Sigma, y=1.0, sign=1.0):
+        """
+        Fold in N(mu, y * Sigma) for a dense covariance.
+
+        Sigma = L L^T gives the precision factor L^-T. Being full rank, it is
+        folded in by add_factor with a single refactorization of Lambda.
+        """
+        L_Sigma = torch.linalg.cholesky(Sigma)
+        eye = torch.eye(self.D, device=Sigma.device, dtype=Sigma.dtype)
+        W = torch.linalg.solve_triangular(L_Sigma.T, eye, upper=True)     # L^-T, (D, D)
+        self.add_factor(mu, W, y, sign)
+
+    def remove(self, mu, Sigma, y=1.0):
+        """Remove a constraint previously added with add."""
+        self.add(mu, Sigma, y, sign=-1.0)
+
+    def _factor(self):
+        if self.precision is None:
+            raise RuntimeError("no constraints have been added yet")
+        if self.L is None:
+            raise RuntimeError("the summed precision is not positive definite yet; add constraints "
+                               "until it is full rank or construct with prior_precision > 0")
+        return self.L
+
+    def mean(self):
+        """Mean of the product Gaussian (the current estimate x̂), O(D^2)."""
+        return torch.cholesky_solve(self.eta.unsqueeze(-1), self._factor()).squeeze(-1)
+
+    def expected_error(self):
+        """sqrt(mean eigenvalue) of the product covariance, O(1)."""
+        self._factor()
+        return torch.sqrt(self.trace_cov / self.D)
+
+    def covariance(self):
+        """Product covariance Lambda^-1, O(D^3)."""
+        L = self._factor()
+        eye = torch.eye(self.D, device=L.device, dtype=L.dtype)
+        return torch.cholesky_solve(eye, L)
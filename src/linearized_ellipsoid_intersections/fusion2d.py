@@ -0,0 +1,131 @@
+import math
+import torch
+
+# Closed-form 2x2 Gaussian-product fusion.
+#
+# A symmetric 2x2 matrix [[a, b], [b, c]] is carried as its three components,
+# each shaped (T, N) or (T,). Inverses, determinants and eigenvalues are the
+# analytic 2x2 formulas, so a batch of trials is only elementwise arithmetic:
+# no torch.inverse, no torch.linalg.eigvalsh, no per-trial Python.
+
+def generate_gaussians_2d(num_trials, N, mean_shift=2.0, device='cpu'):
+    """
+    2D counterpart of fusion.generate_gaussians.
+
+    Draws from the RNG in the same order as generate_gaussians(num_trials, N, 2),
+    so the same seed yields the same Gaussians.
+
+    Returns:
+        mus:     (T, N, 2) - Gaussian means
+        Sigmas:  tuple (a, b, c), each (T, N) - covariance components
+    """
+    shifts = mean_shift * torch.arange(N, device=device, dtype=torch.float32).view(1, N, 1)
+    mus = torch.randn(num_trials, N, 2, device=device) + shifts
+    A = torch.randn(num_trials, N, 2, 2, device=device)
+    a = A[..., 0, 0] ** 2 + A[..., 0, 1] ** 2 + 0.5
+    b = A[..., 0, 0] * A[..., 1, 0] + A[..., 0, 1] * A[..., 1, 1]
+    c = A[..., 1, 0] ** 2 + A[..., 1, 1] ** 2 + 0.5
+    return mus, (a, b, c)
+
+
+def inverse_2x2(a, b, c):
+    """Inverse of [[a, b], [b, c]] as components."""
+    det = a * c - b * b
+    return c / det, -b / det, a / det
+
+
+def eigvals_2x2(a, b, c):
+    """Eigenvalues (smallest, largest) of [[a, b], [b, c]]."""
+    half_trace = 0.5 * (a + c)
+    radius = torch.sqrt(0.25 * (a - c) ** 2 + b * b)
+    return half_trace - radius, half_trace + radius
+
+
+def mahalanobis_squared_2d(x, mus, Sigmas):
+    """
+    Args:
+        x:      (T, 2)    - true points
+        mus:    (T, N, 2) - Gaussian means
+        Sigmas: tuple (a, b, c), each (T, N)
+
+    Returns:
+        ys: (T, N) - squared Mahalanobis distances
+    """
+    a, b, c = Sigmas
+    dx = x[:, None, 0] - mus[..., 0]
+    dy = x[:, None, 1] - mus[..., 1]
+    det = a * c - b * b
+    return (c * dx * dx - 2 * b * dx * dy + a * dy * dy) / det
+
+
+def fuse_scaled_gaussians_2d(mus, Sigmas, ys):
+    """
+    Closed-form equivalent of fusion.fuse_scaled_gaussians for D = 2.
+
+    Args:
+        mus:    (T, N, 2) - Gaussian means
+        Sigmas: tuple (a, b, c), each (T, N)
+        ys:     (T, N)    - squared Mahalanobis distances
+
+    Returns:
+        mu_product:    (T, 2) - mean of the product Gaussian
+        Sigma_product: tuple (a, b, c), each (T,)
+    """
+    p, q, r = inverse_2x2(*Sigmas)
+    w = 1.0 / ys
+    mx, my = mus[..., 0], mus[..., 1]
+
+    # Information form: summed precision and precision-weighted mean
+    P = torch.sum(w * p, dim=1)
+    Q = torch.sum(w * q, dim=1)
+    R = torch.sum(w * r, dim=1)
+    eta_x = torch.sum(w * (p * mx + q * my), dim=1)
+    eta_y = torch.sum(w * (q * mx + r * my), dim=1)
+
+    sa, sb, sc = inverse_2x2(P, Q, R)
+    mu_product = torch.stack([sa * eta_x + sb * eta_y, sb * eta_x + sc * eta_y], dim=-1)
+    return mu_product, (sa, sb, sc)
+
+
+def stream_error_stats_2d(N, num_trials, chunk_size=1 << 18, mean_shift=2.0, device='cpu'):
+    """
+    Observed error vs sqrt(mean eigenvalue) over num_trials 2D trials.
+
+    Trials are generated and fused chunk_size at a time and only running sums
+    are kept, so memory is bounded by the chunk size regardless of num_trials.
+    Sums are accumulated in float64 on device; the host only syncs once at the end.
+
+    Returns:
+        dict with num_trials and the mean and standard error of the mean of
+        the observed error ||x - x̂|| and of the expected error.
+    """
+    sums = torch.zeros(4, dtype=torch.float64, device=device)
+    done = 0
+    while done < num_trials:
+        T = min(chunk_size, num_trials - done)
+        x = torch.randn(T, 2, device=device)
+        mus, Sigmas = generate_gaussians_2d(T, N, mean_shift, device)
+        ys = mahalanobis_squared_2d(x, mus, Sigmas)
+        mu_product, (sa, sb, sc) = fuse_scaled_gaussians_2d(mus, Sigmas, ys)
+
+        errors = torch.norm(x - mu_product, dim=1).double()
+        expected = torch.sqrt(0.5 * (sa + sc)).double()
+        sums += torch.stack([errors.sum(), (errors ** 2).sum(), expected.sum(), (expected ** 2).sum()])
+        done += T
+
+    err_sum, err_sq, exp_sum, exp_sq = sums.tolist()
+
+    def mean_sem(total, total_sq):
+        mean = total / num_trials
+        var = max(total_sq - num_trials * mean ** 2, 0.0) / max(num_trials - 1, 1)
+        return mean, math.sqrt(var / num_trials)
+
+    error_mean, error_sem = mean_sem(err_sum, err_sq)
+    expected_mean, expected_sem = mean_sem(exp_sum, exp_sq)
+    return {
+        'num_trials': num_trials,
+        'error_mean': error_mean,
+        'error_sem': error_sem,
+        'expected_mean': expected_mean,
+        'expected_sem': expected_sem,
+    }
@@ -0,0 +1,95 @@
+import torch
+
+# Structured covariance samplers.
+#
+# The experiment generators draw a dense A, form A A^T + 0.5 I (O(D^3)) and
+# invert it. The samplers here produce covariances already in factored form,
+# so both Sigma and Sigma^-1 can be applied without an inverse:
+#
+#   - wishart_cholesky: Bartlett decomposition, Sigma = T T^T with T lower
+#     triangular. Sigma^-1 is applied with triangular solves against T.
+#   - haar_householder + spectrum: Sigma = Q diag(lambda) Q^T with Q a random
+#     orthogonal matrix kept as Householder reflectors and lambda a chosen
+#     eigenvalue profile. Sigma^-1 = Q diag(1 / lambda) Q^T.
+
+def wishart_cholesky(n, D, df=None, device='cpu'):
+    """
+    Cholesky factors of n Wishart(I, df) covariances via the Bartlett decomposition.
+
+    T has N(0, 1) entries below the diagonal and sqrt(chi^2(df - i)) on
+    diagonal entry i, so only O(D^2) random numbers are drawn and no matrix
+    product or factorization is needed. With df = D, T T^T has the same
+    distribution as A A^T for a D x D standard normal A; note that this is
+    without the + 0.5 I ridge of the experiment generators, so the smallest
+    eigenvalues come close to zero.
+
+    Returns:
+        T: (n, D, D) - lower triangular, Sigma = T T^T
+    """
+    df = D if df is None else df
+    if df < D:
+        raise ValueError(f"df must be at least D ({D}), got {df}")
+    T = torch.randn(n, D, D, device=device).tril(-1)
+    dofs = df - torch.arange(D, device=device, dtype=torch.float32)
+    chi2 = torch.distributions.Chi2(dofs).sample((n,))  # (n, D)
+    return T + torch.diag_embed(chi2.sqrt())
+
+
+def haar_householder(n, D, device='cpu'):
+    """
+    n Haar-distributed random orthogonal matrices as Householder reflectors.
+
+    Reflector j maps an independent standard normal vector in R^(D-j) onto
+    the j-th axis; a sign per column makes the product exactly Haar
+    distributed (the same construction as QR of a Gaussian matrix with
+    positive diagonal R). Q = householder_product(V, tau) * signs.
+
+    Returns:
+        V:     (n, D, D) - reflectors below the diagonal (unit diagonal implied)
+        tau:   (n, D)    - reflector scales
+        signs: (n, D)    - column signs
+    """
+    X = torch.randn(n, D, D, device=device).tril()
+    alpha = torch.diagonal(X, dim1=-2, dim2=-1)
+    norms = torch.linalg.norm(X, dim=-2)
+    sign = torch.where(alpha >= 0, torch.ones_like(alpha), -torch.ones_like(alpha))
+    v0 = alpha + sign * norms
+    V = X.tril(-1) / v0.unsqueeze(-2)
+    tau = 2.0 / (1.0 + V.pow(2).sum(-2))
+    return V, tau, -sign
+
+
+def apply_householder(V, tau, signs, X, transpose=False):
+    """
+    Q X (or Q^T X) for Q = householder_product(V, tau) * signs in O(D^2) per column,
+    without forming Q.
+
+    Args:
+        X: (n, D, m)
+    """
+    if transpose:
+        return signs.unsqueeze(-1) * torch.ormqr(V, tau, X, left=True, transpose=True)
+    return torch.ormqr(V, tau, signs.unsqueeze(-1) * X, left=True, transpose=False)
+
+
+def spectrum(n, D, profile='geometric', condition=100.0, scale=1.0, device='cpu'):
+    """
+    Eigenvalue profiles, largest first.
+
+    Args:
+        profile:   'geometric' (log-linear decay) or 'linear'
+        condition: ratio of the largest to the smallest eigenvalue
+        scale:     largest eigenvalue
+
+    Returns:
+        eigvals: (n, D)
+    """
+    t = torch.linspace(0.0, 1.0, D, device=device)
+    if profile == 'geometric':
+        eigvals = scale * condition ** (-t)
+    elif profile == 'linear':
+        eigvals = scale * (1.0 - (1.0 - 1.0 / condition) * t)
+    else:
+        raise ValueError("profile must be 'geometric' or 'linear'")
+    return eigvals.expand(n, D).clone()
+
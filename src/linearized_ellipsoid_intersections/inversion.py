@@ -0,0 +1,192 @@
+import torch
+from torch import nn
+from .putils import Timer, Abs, MLP2, SimpleClassifierModel2, OffsetClassifierModel
+from .losses import HyperplaneLoss, train_levenberg_marquardt
+from .solver import StoppingCriteria, conjugate_gradient
+
+# Reconstructing the inputs of a trained classifier from its first layer.
+#
+# Every unit of a linear layer followed by |.| or ReLU constrains the input to
+# a pair of hyperplanes (or a half-space) at a known distance; the outputs of
+# all units together are the constraint set a HyperplaneLoss solves. The
+# evaluation data is streamed through the layer in chunks and each chunk is
+# reconstructed as one batch of queries, so memory is bounded by the chunk,
+# not by the dataset.
+
+_activations = ((Abs, 'abs'), (nn.ReLU, 'relu'), (nn.Identity, 'identity'))
+
+
+def _activation_name(module):
+    for cls, name in _activations:
+        if isinstance(module, cls):
+            return name
+    raise ValueError(f"unsupported activation {type(module).__name__}; use Abs, ReLU or Identity")
+
+
+def _linear(module):
+    if not isinstance(module, nn.Linear):
+        raise ValueError(f"first layer must be an nn.Linear, got {type(module).__name__}")
+    W = module.weight.detach()
+    if module.bias is None:
+        return W, torch.zeros(W.shape[0], device=W.device, dtype=W.dtype)
+    return W, module.bias.detach()
+
+
+def layer_constraints(model):
+    """
+    Per-unit constraints of the first layer of a trained model.
+
+    Unit k outputs act(w_k . x + b_k). OffsetClassifierModel adds a per-class
+    offset to every latent unit before its activation, so each (class, unit)
+    pair is a separate hyperplane sharing the unit's weight row.
+
+    Args:
+        model: MLP2, SimpleClassifierModel2 or OffsetClassifierModel
+
+    Returns:
+        W:          (k, D) - unit weights
+        b:          (k,)   - unit biases
+        activation: 'abs', 'relu' or 'identity'
+    """
+    if isinstance(model, MLP2):
+        W, b = _linear(model.linear0)
+        return W, b, _activation_name(model.activation)
+    if isinstance(model, SimpleClassifierModel2):
+        W, b = _linear(model.model[0])
+        return W, b, _activation_name(model.model[1])
+    if isinstance(model, OffsetClassifierModel):
+        W, b = _linear(model.input_model)
+        offsets = model.bias_offsets.detach()               # (output_dim, latent_dim)
+        # Matches the flatten order of forward: unit index = class * latent_dim + j
+        return W.repeat(offsets.shape[0], 1), (b + offsets).flatten(), _activation_name(model.activation)
+    raise ValueError(f"unsupported model {type(model).__name__}")
+
+
+def linearized_estimate(W, b, Y, activation, x_ref, iters=50, ridge=1e-6):
+    """
+    Least-squares inputs for observed layer outputs, after undoing the
+    activation unit by unit:
+
+        identity: pre-activation z = y for every unit
+        relu:     z = y for the active units (y > 0); a zero output only
+                  bounds z, so inactive units are left out
+        abs:      z = s y, with s the sign of the unit's pre-activation at
+                  x_ref, i.e. the branch of |.| that contains x_ref
+
+    Then solves min ||m (W x + b - z)||^2 + ridge ||x - x_ref||^2 per query
+    by batched conjugate gradient, where m masks the units used; directions
+    the units leave unconstrained stay at x_ref. W^T diag(m) W is never formed.
+
+    Args:
+        W:     (k, D)
+        b:     (k,)
+        Y:     (B, k) - observed outputs
+        x_ref: (D,)   - reference input, e.g. the dataset mean
+        ridge: Tikhonov weight relative to the mean diagonal of W^T W
+
+    Returns:
+        X: (B, D)
+    """
+    z = Y
+    mask = torch.ones_like(Y)
+    if activation == 'relu':
+        mask = (Y > 0).to(Y.dtype)
+    elif activation == 'abs':
+        z = torch.where(x_ref @ W.T + b >= 0, Y, -Y)
+
+    lam = ridge * W.pow(2).sum(0).mean()
+    # Solve for u = x - x_ref: (W^T M W + lam I) u = W^T M (z - b - W x_ref)
+    rhs = (mask * (z - b - x_ref @ W.T)) @ W                # (B, D)
+
+    def matvec(v):
+        return (mask * (v @ W.T)) @ W + lam * v
+
+    precond = mask @ W.pow(2) + lam                         # diag(W^T M W) + lam
+    return x_ref + conjugate_gradient(matvec, rhs, precond, iters)
+
+
+def invert_layer(model, sampler, device, batch_size=256, num_iters=50, inner='cg', cg_iters=50,
+                 criteria=None, warm_start=True, x_ref=None, num_classes=None):
+    """
+    Reconstruct every input of sampler from the first-layer outputs of model.
+
+    Inputs are processed batch_size at a time: the layer outputs of a chunk
+    are computed and its inputs reconstructed together by batched
+    Levenberg-Marquardt. The Jacobian of a chunk takes batch_size * k * D
+    floats, which bounds the memory use. Per-class error sums are kept on
+    the device and read back once at the end.
+
+    Args:
+        model:       MLP2, SimpleClassifierModel2 or OffsetClassifierModel
+        sampler:     evaluation Sampler; its data is read in order
+        batch_size:  inputs reconstructed per chunk
+        num_iters:   LM iteration cap per chunk
+        inner:       LM inner solver; 'cg' copes with the singular normal
+                     matrix of a layer with fewer units than input dimensions
+        criteria:    StoppingCriteria (default: relative residual 1e-5)
+        warm_start:  start from linearized_estimate instead of zero
+        x_ref:       (D,) reference input of the warm start (default: the
+                     mean of the sampler's data)
+        num_classes: number of classes (default: max label + 1)
+
+    Returns:
+        dict of (C,) CPU tensors per class: 'count', 'error' (mean
+        ||x - x_hat||), 'relative_error' (mean ||x - x_hat|| / ||x||) and
+        'residual_rms' (mean RMS of the final output residuals)
+    """
+    W, b, activation = layer_constraints(model)
+    W, b = W.to(device), b.to(device)
+    if criteria is None:
+        criteria = StoppingCriteria(residual_tol=1e-5, grad_tol=1e-8, check_every=1)
+
+    data, labels = sampler.all()
+    if warm_start and x_ref is None:
+        x_ref = data.mean(0).to(device).float()
+    N = data.shape[0]
+    if num_classes is None:
+        num_classes = int(labels.max()) + 1
+    sums = torch.zeros(3, num_classes, dtype=torch.float64, device=device)
+    counts = torch.zeros(num_classes, dtype=torch.long, device=device)
+
+    # Zero targets make the residuals the layer outputs themselves
+    layer = HyperplaneLoss(W, b, torch.zeros_like(b), activation)
+
+    timer = Timer()
+    for start in range(0, N, batch_size):
+        X = data[start:start + batch_size].to(device).float()
+        y = labels[start:start + batch_size].to(device)
+        with torch.no_grad():
+            Y, _ = layer.residuals(X, jacobian=False)   # (B, k)
+            if warm_start:
+                X_init = linearized_estimate(W, b, Y, activation, x_ref, cg_iters)
+            else:
+                X_init = torch.zeros_like(X)
+
+            criterion = HyperplaneLoss(W, b, Y, activation)
+            X_est = train_levenberg_marquardt(X_init, X, criterion, num_iters, device, inner=inner,
+                                              cg_iters=cg_iters, criteria=criteria, verbose=False)
+
+            error = torch.norm(X - X_est, dim=1)
+            residual, _ = criterion.residuals(X_est, jacobian=False)
+            stats = torch.stack([error,
+                                 error / torch.norm(X, dim=1).clamp(min=1e-12),
+                                 residual.pow(2).mean(1).sqrt()])
+            sums.index_add_(1, y, stats.double())
+            counts += torch.bincount(y, minlength=num_classes)
+        print(f"Inverted {min(start + batch_size, N)}/{N} inputs ({timer.tick():.2f}s)")
+
+    sums, counts = sums.cpu(), counts.cpu()
+    means = sums / counts.clamp(min=1)
+    return {'count': counts, 'error': means[0], 'relative_error': means[1], 'residual_rms': means[2]}
+
+
+def format_class_report(stats):
+    """Table of the per-class statistics returned by invert_layer, with a count-weighted total row."""
+    lines = [f"{'Class':>6} {'Count':>7} {'Error':>10} {'Rel. error':>11} {'Residual RMS':>13}"]
+    for c in range(stats['count'].shape[0]):
+        lines.append(f"{c:>6} {stats['count'][c].item():>7} {stats['error'][c].item():>10.6f} "
+                     f"{stats['relative_error'][c].item():>11.6f} {stats['residual_rms'][c].item():>13.6f}")
+    w = stats['count'].double() / stats['count'].sum().clamp(min=1)
+    lines.append(f"{'All':>6} {stats['count'].sum().item():>7} {(w * stats['error']).sum().item():>10.6f} "
+                 f"{(w * stats['relative_error']).sum().item():>11.6f} {(w * stats['residual_rms']).sum().item():>13.6f}")
+    return "\n".join(lines)
@@ -0,0 +1,794 @@
+import copy
+import os
+import threading
+import traceback
+import torch
+import torch.multiprocessing as mp
+from torch import nn
+from .putils import Timer, profiler
+from .ellipsoids import EllipsoidBank
+from .solver import solve, conjugate_gradient
+
+def adam_update(x, grad, state, lr, beta1=0.9, beta2=0.999, eps=1e-8, t=1):
+    exp_avg, exp_avg_sq = state
+
+    exp_avg.mul_(beta1).add_(grad, alpha=1 - beta1)
+    exp_avg_sq.mul_(beta2).addcmul_(grad, grad, value=1 - beta2)
+
+    bias_correction1 = 1 - beta1 ** t
+    bias_correction2 = 1 - beta2 ** t
+    step_size = lr * (bias_correction2**0.5) / bias_correction1
+
+    step = step_size * exp_avg / (exp_avg_sq.sqrt() + eps)
+    x -= step
+
+    return x
+
+class ConstraintSampler:
+    def __init__(self, k, batch_size, mode='uniform', device='cpu', floor=0.5):
+        """
+        Draws a mini-batch of b constraint indices per step with the weights
+        that keep the sampled loss and gradient unbiased estimates of the
+        full sums over all k constraints.
+
+        Modes:
+            'uniform':    b distinct indices, weight k / b each
+            'epoch':      consecutive b-slices of a stream of permutations,
+                          so every constraint is visited once per epoch; when
+                          b does not divide k the tail of one permutation
+                          starts the next batch. Weight k / b each
+            'importance': b indices drawn with replacement with probability
+                          p_i, weight 1 / (b p_i). p_i is proportional to the
+                          last observed |residual| of constraint i, mixed with
+                          a uniform floor so no constraint starves
+
+        Args:
+            k:          number of constraints
+            batch_size: constraints per step, b
+            mode:       'uniform', 'epoch' or 'importance'
+            floor:      uniform share of the importance distribution
+        """
+        if mode not in ('uniform', 'epoch', 'importance'):
+            raise ValueError("mode must be 'uniform', 'epoch' or 'importance'")
+        self.k = k
+        self.b = min(batch_size, k)
+        self.mode = mode
+        self.device = device
+        self.floor = floor
+        self.scores = torch.ones(k, device=device)  # last |residual| per constraint
+        self.perm = torch.empty(0, dtype=torch.long, device=device)  # unvisited indices from perm[pos:]
+        self.pos = 0
+
+    @property
+    def fraction(self):
+        return self.b / self.k
+
+    def draw(self):
+        """
+        Returns:
+            idx:     (b,) - constraint indices
+            weights: (b,) - unbiasing weights
+        """
+        if self.mode == 'importance':
+            p = self.floor / self.k + (1 - self.floor) * self.scores / self.scores.sum()
+            idx = torch.multinomial(p, self.b, replacement=True)
+            return idx, 1.0 / (self.b * p[idx])
+
+        if self.mode == 'epoch':
+            if self.pos + self.b > self.perm.shape[0]:
+                # Carry the unvisited tail over instead of dropping it
+                self.perm = torch.cat([self.perm[self.pos:], torch.randperm(self.k, device=self.device)])
+                self.pos = 0
+            idx = self.perm[self.pos:self.pos + self.b]
+            self.pos += self.b
+        else:
+            idx = torch.randperm(self.k, device=self.device)[:self.b]
+        return idx, torch.full((self.b,), self.k / self.b, device=self.device)
+
+    def update(self, idx, delta):
+        """Record the residuals (b,) or (B, b) observed for constraints idx."""
+        if self.mode == 'importance':
+            self.scores[idx] = delta.abs().view(-1, idx.shape[0]).mean(0) + 1e-8
+
+
+def train_manual_adam(x_est, x_true, criterion, num_iters, lr, device, label="",
+                      batch_size=None, sampling='uniform', lr_scaling='sqrt', criteria=None,
+                      return_iterations=False, num_workers=None, verbose=True):
+    """
+    Manual Adam on x_est, a single (D,) estimate or a (B, D) batch of
+    independent queries. Errors and losses are reported as batch means.
+
+    With batch_size set, every step evaluates a fresh mini-batch of b
+    constraints drawn by a ConstraintSampler instead of all k, cutting the
+    per-step cost from O(k D^2) to O(b D^2). Sampled terms are reweighted so
+    the gradient stays unbiased; lr is scaled by the batch fraction b / k
+    following the linear scaling rule ('linear'), by its square root
+    ('sqrt'), or left as given ('none').
+
+    With criteria set, the run is driven by solver.solve and every query
+    stops as soon as it meets the StoppingCriteria; num_iters is then a cap.
+
+    With num_workers set, the loss and gradient are evaluated by a
+    ShardedLoss over that many worker processes (CPU only, full batch).
+
+    Args:
+        criterion:  manual loss; called as criterion(x, idx, weights) when sampling
+        batch_size: constraints per step, or None for the full batch
+        sampling:   'uniform', 'epoch' or 'importance'
+        lr_scaling: 'linear', 'sqrt' or 'none'
+        criteria:   optional StoppingCriteria
+        return_iterations: also return the (B,) iterations run by each query
+        num_workers: worker processes for sharded evaluation, or None
+        verbose:    print progress and the final summary
+    """
+    if num_workers is not None and batch_size is not None:
+        raise ValueError("sharded evaluation does not support constraint subsampling")
+    exp_avg = torch.zeros_like(x_est, device=device).view(-1, x_est.shape[-1])
+    exp_avg_sq = torch.zeros_like(x_est, device=device).view(-1, x_est.shape[-1])
+
+    sampler = None
+    if batch_size is not None:
+        sampler = ConstraintSampler(criterion.y.shape[-1], batch_size, sampling, device)
+        if lr_scaling == 'linear':
+            lr = lr * sampler.fraction
+        elif lr_scaling == 'sqrt':
+            lr = lr * sampler.fraction ** 0.5
+        elif lr_scaling != 'none':
+            raise ValueError("lr_scaling must be 'linear', 'sqrt' or 'none'")
+
+    active, active_rows = criterion, None
+
+    def step(X, state, t, rows):
+        nonlocal active, active_rows
+        if rows is not active_rows:
+            active, active_rows = select_queries(criterion, rows), rows
+        with profiler.section('loss'):
+            if sampler is None:
+                loss, grad = active(X)
+            else:
+                idx, weights = sampler.draw()
+                loss, grad = active(X, idx, weights)
+                sampler.update(idx, active.last_delta)
+        with profiler.section('adam'):
+            X = adam_update(X, grad, state, lr, t=t)
+        return X, loss, grad
+
+    sharded = None
+    if num_workers is not None:
+        criterion = sharded = ShardedLoss(criterion, num_workers, max_queries=exp_avg.shape[0])
+
+    timer = Timer()
+    try:
+        x_est, iterations = solve(x_est, step, num_iters, criteria, state=(exp_avg, exp_avg_sq),
+                                  y=criterion.y, x_true=x_true, label=label, log_every=1000 if verbose else None)
+    finally:
+        if sharded is not None:
+            sharded.close()
+
+    if verbose:
+        print(f"{label} Time: {timer.tick():.2f}s")
+        if criteria is not None:
+            print(f"{label} Iterations: mean {iterations.float().mean().item():.0f}, max {iterations.max().item()}")
+        final_error = torch.norm(x_true - x_est, dim=-1).mean().item()
+        print(f"{label} Final Error: {final_error:.6f}")
+    if return_iterations:
+        return x_est, iterations
+    return x_est
+
+
+def train_levenberg_marquardt(x_est, x_true, criterion, num_iters, device, label="",
+                              damping=1e-3, inner='cholesky', cg_iters=50, cg_tol=1e-6, criteria=None,
+                              return_iterations=False, verbose=True):
+    """
+    Levenberg-Marquardt on the residuals d_k(x) - y_k of a manual loss, for a
+    single (D,) estimate or a (B, D) batch of independent queries.
+
+    Each iteration solves (J^T J + lambda diag(J^T J)) step = -J^T r with the
+    analytic residual Jacobian from criterion.residuals. lambda is adapted per
+    query from the ratio of actual to predicted loss reduction (Nielsen's
+    rule): good steps move towards Gauss-Newton, rejected steps towards scaled
+    gradient descent. The system is solved by a Cholesky factorization of the
+    (D, D) normal matrix, or with inner='cg' by Jacobi-preconditioned conjugate
+    gradient on J^T (J v) products, O(k D) per inner iteration without ever
+    forming J^T J.
+
+    Rejected steps leave the loss unchanged, so criteria should stop on
+    grad_tol or residual_tol (checked every step) rather than rel_loss_tol.
+
+    Args:
+        criterion: SphericalLoss, EllipticalLoss, PrincipalComponentLoss or HyperplaneLoss
+        damping:   initial lambda
+        inner:     'cholesky' or 'cg'
+        cg_iters:  conjugate gradient iterations per step
+        cg_tol:    relative residual tolerance of the inner solve
+        criteria:  optional StoppingCriteria
+        return_iterations: also return the (B,) iterations run by each query
+        verbose:   print progress and the final summary
+    """
+    if inner not in ('cholesky', 'cg'):
+        raise ValueError("inner must be 'cholesky' or 'cg'")
+    B = 1 if x_est.dim() == 1 else x_est.shape[0]
+    lam = torch.full((B,), damping, device=device)
+    nu = torch.full((B,), 2.0, device=device)
+
+    active, active_rows = criterion, None
+
+    def step(X, state, t, rows):
+        nonlocal active, active_rows
+        if rows is not active_rows:
+            active, active_rows = select_queries(criterion, rows), rows
+        lam, nu = state
+
+        with profiler.section('jacobian'):
+            r, J = active.residuals(X)                      # (b, k), (b, k, D)
+            loss = 0.5 * r.pow(2).sum(1)
+            g = torch.einsum('bk,bkd->bd', r, J)            # J^T r
+            diag = J.pow(2).sum(1).clamp(min=1e-12)         # diag(J^T J)
+        with profiler.section('normal equations'):
+            if inner == 'cholesky':
+                A = J.transpose(1, 2) @ J + torch.diag_embed(lam.unsqueeze(-1) * diag)
+                L, info = torch.linalg.cholesky_ex(A)
+                solved = info == 0
+                delta = -torch.cholesky_solve(g.unsqueeze(-1), L).squeeze(-1)
+            else:
+                def matvec(v):
+                    Jv = torch.einsum('bkd,bd->bk', J, v)
+                    return torch.einsum('bkd,bk->bd', J, Jv) + lam.unsqueeze(-1) * diag * v
+                solved = torch.ones_like(lam, dtype=torch.bool)
+                delta = -conjugate_gradient(matvec, g, (1 + lam.unsqueeze(-1)) * diag, cg_iters, cg_tol)
+
+        # Gain ratio: actual over predicted reduction of 0.5 ||r||^2
+        Jd = torch.einsum('bkd,bd->bk', J, delta)
+        predicted = -(g * delta).sum(1) - 0.5 * Jd.pow(2).sum(1)
+        with profiler.section('trial'):
+            r_new, _ = active.residuals(X + delta, jacobian=False)
+            loss_new = 0.5 * r_new.pow(2).sum(1)
+        rho = (loss - loss_new) / predicted.clamp(min=1e-30)
+        accept = solved & (rho > 0) & torch.isfinite(loss_new)
+
+        shrink = torch.clamp(1 - (2 * rho - 1) ** 3, min=1.0 / 3.0)
+        lam.copy_(torch.where(accept, lam * shrink, lam * nu).clamp(1e-12, 1e12))
+        nu.copy_(torch.where(accept, torch.full_like(nu, 2.0), nu * 2))
+        X = torch.where(accept.unsqueeze(-1), X + delta, X)
+        return X, torch.where(accept, loss_new, loss), g
+
+    timer = Timer()
+    x_est, iterations = solve(x_est, step, num_iters, criteria, state=(lam, nu),
+                              y=criterion.y, x_true=x_true, label=label, log_every=5 if verbose else None)
+
+    if verbose:
+        print(f"{label} Time: {timer.tick():.2f}s")
+        print(f"{label} Iterations: mean {iterations.float().mean().item():.0f}, max {iterations.max().item()}")
+        final_error = torch.norm(x_true - x_est, dim=-1).mean().item()
+        print(f"{label} Final Error: {final_error:.6f}")
+    if return_iterations:
+        return x_est, iterations
+    return x_est
+
+
+# The manual losses take a single estimate x of shape (D,) or a batch of B
+# estimates of shape (B, D), with targets y of shape (k,) shared by all queries
+# or (B, k) per query. Batched calls read the constraint bank once for all B
+# queries as a matrix product and return per-query losses (B,) and gradients
+# (B, D); single calls return a scalar loss and a (D,) gradient.
+#
+# All losses can also be evaluated on a subset of the constraints, idx (b,),
+# with optional per-constraint weights (b,) (see ConstraintSampler). The
+# residuals d - y of the last call are kept in last_delta.
+#
+# residuals(x) returns the batched residuals d - y (B, k) and their Jacobian
+# (B, k, D) for the Gauss-Newton / Levenberg-Marquardt solver.
+
+def _as_queries(x):
+    return x.view(-1, x.shape[-1])
+
+
+def _unbatch(x, loss, grad):
+    if x.dim() == 1:
+        return loss[0], grad[0]
+    return loss, grad
+
+
+def select_queries(criterion, rows):
+    """Manual loss restricted to the queries rows; shared (k,) targets need no copy."""
+    if criterion.y.shape[0] == 1:
+        return criterion
+    sub = copy.copy(criterion)
+    sub.y = criterion.y[rows]
+    if hasattr(criterion, 'rows'):  # ShardedLoss forwards the rows to its workers
+        sub.rows = rows if criterion.rows is None else criterion.rows[rows]
+    return sub
+
+
+def select_constraints(criterion, idx):
+    """Manual loss restricted to the constraints idx; a slice keeps views of the original tensors."""
+    sub = copy.copy(criterion)
+    for name in criterion._per_constraint:
+        value = getattr(criterion, name, None)
+        if isinstance(value, EllipsoidBank):
+            setattr(sub, name, value.subset(idx))
+        elif value is not None:
+            setattr(sub, name, value[idx])
+    sub.y = criterion.y[:, idx]
+    return sub
+
+
+class SphericalLoss:
+    _per_constraint = ('mus', 'mus_sq')
+
+    def __init__(self, mus, y):
+        self.mus = mus
+        self.y = y.view(-1, y.shape[-1])                    # (1 or B, k)
+        self.mus_sq = mus.pow(2).sum(1)                     # (k,)
+
+    def _distances(self, X, mus, mus_sq):
+        # ||x - mu||^2 = ||x||^2 - 2 x.mu + ||mu||^2, one GEMM for all queries
+        d2 = X.pow(2).sum(1, keepdim=True) - 2 * (X @ mus.T) + mus_sq
+        return torch.sqrt(d2.clamp(min=0.0)) + 1e-8         # (B, k)
+
+    def __call__(self, x, idx=None, weights=None):
+        mus, mus_sq, y = self.mus, self.mus_sq, self.y
+        if idx is not None:
+            mus, mus_sq, y = mus[idx], mus_sq[idx], y[:, idx]
+        c = 1.0 if weights is None else weights
+
+        X = _as_queries(x)                                  # (B, D)
+        d = self._distances(X, mus, mus_sq)
+        delta = d - y
+        self.last_delta = delta
+        w = c * delta / d
+        # sum_k w_k (x - mu_k) = x sum_k w_k - w @ mus
+        grad = X * w.sum(1, keepdim=True) - w @ mus
+        loss = 0.5 * torch.sum(c * delta**2, dim=1)
+        return _unbatch(x, loss, grad)
+
+    def residuals(self, x, jacobian=True):
+        """
+        Residuals d_k - y_k and their Jacobian (x - mu_k) / d_k.
+
+        Returns:
+            delta: (B, k)
+            J:     (B, k, D), or None
+        """
+        X = _as_queries(x)
+        d = self._distances(X, self.mus, self.mus_sq)
+        if not jacobian:
+            return d - self.y, None
+        return d - self.y, (X.unsqueeze(1) - self.mus) / d.unsqueeze(-1)
+
+
+class EllipticalLoss:
+    _per_constraint = ('mus', 'inv_Sigmas', 'prec_mus')
+
+    def __init__(self, mus, inv_Sigmas, y):
+        """
+        Args:
+            mus:        (k, D)          - ellipsoid centers
+            inv_Sigmas: (k, D, D)       - precisions, or an EllipsoidBank of Cholesky factors
+            y:          (k,) or (B, k)  - target Mahalanobis distances
+        """
+        self.mus = mus
+        self.inv_Sigmas = inv_Sigmas
+        self.y = y.view(-1, y.shape[-1])
+        if not isinstance(inv_Sigmas, EllipsoidBank):
+            self.prec_mus = torch.einsum('kij,kj->ki', inv_Sigmas, mus)  # (k, D)
+
+    def _mahalanobis(self, X, idx=None):
+        """Distances d (B, k), precision-weighted diffs Sigma^-1 (x - mu) (B, k, D) and targets."""
+        mus, inv_Sigmas, y = self.mus, self.inv_Sigmas, self.y
+        is_bank = isinstance(inv_Sigmas, EllipsoidBank)
+        if not is_bank:
+            prec_mus = self.prec_mus
+        if idx is not None:
+            mus, y = mus[idx], y[:, idx]
+            if is_bank:
+                inv_Sigmas = inv_Sigmas.subset(idx)
+            else:
+                inv_Sigmas, prec_mus = inv_Sigmas[idx], prec_mus[idx]
+
+        diffs = X.unsqueeze(1) - mus                        # (B, k, D)
+        if is_bank:
+            d2, prec_diffs = inv_Sigmas.mahalanobis_grad(diffs)
+        else:
+            # Sigma_k^-1 x_b for every query in one pass over the precisions
+            prec_diffs = torch.einsum('kij,bj->bki', inv_Sigmas, X) - prec_mus
+            d2 = torch.sum(diffs * prec_diffs, dim=-1)
+        return torch.sqrt(d2 + 1e-8), prec_diffs, y
+
+    def __call__(self, x, idx=None, weights=None):
+        c = 1.0 if weights is None else weights
+        X = _as_queries(x)
+        d, prec_diffs, y = self._mahalanobis(X, idx)        # (B, k), (B, k, D)
+        delta = d - y
+        self.last_delta = delta
+        w = c * delta / (d + 1e-8)
+        grad = torch.einsum('bk,bkd->bd', w, prec_diffs)
+        loss = 0.5 * torch.sum(c * delta**2, dim=1)
+        return _unbatch(x, loss, grad)
+
+    def residuals(self, x, jacobian=True):
+        """
+        Residuals d_k - y_k and their Jacobian Sigma_k^-1 (x - mu_k) / d_k.
+
+        Returns:
+            delta: (B, k)
+            J:     (B, k, D), or None
+        """
+        d, prec_diffs, y = self._mahalanobis(_as_queries(x))
+        if not jacobian:
+            return d - y, None
+        return d - y, prec_diffs / (d + 1e-8).unsqueeze(-1)
+
+
+class PrincipalComponentLoss:
+    _per_constraint = ('mus', 'V', 'Lambda', 'W', 'W_mus')
+
+    def __init__(self, mus, V, Lambda, y, norm_type='l2'):
+        """
+        PCA-based Mahalanobis loss using top r principal components.
+
+        Args:
+            mus:     (k, D)         - Gaussian means
+            V:       (k, r, D)      - Top principal components per Gaussian
+            Lambda:  (k, r)         - Corresponding eigenvalues
+            y:       (k,) or (B, k) - Target distances
+            norm_type: 'l2' or 'l1'
+        """
+        if norm_type not in ('l1', 'l2'):
+            raise ValueError("norm_type must be 'l1' or 'l2'")
+        self.mus = mus               # (k, D)
+        self.V = V                   # (k, r, D)
+        self.Lambda = Lambda         # (k, r)
+        self.y = y.view(-1, y.shape[-1])  # (1 or B, k)
+        self.norm_type = norm_type
+
+        # Precompute W = V / sqrt(Lambda) and its projection of the means
+        self.W = self.V / (self.Lambda.sqrt().unsqueeze(-1) + 1e-8)  # (k, r, D)
+        self.W_mus = torch.einsum('krd,kd->kr', self.W, mus)         # (k, r)
+
+    def _project(self, X, W, W_mus):
+        """
+        Returns:
+            norms:   (B, k)    - l2 or l1 norm of W_k (x - mu_k)
+            weights: (B, k, r) - derivative of the norm w.r.t. the projection
+        """
+        proj = torch.einsum('krd,bd->bkr', W, X) - W_mus  # (B, k, r)
+        if self.norm_type == 'l2':
+            norms = torch.norm(proj, dim=2)  # (B, k)
+            # Safe normalization of projection vectors
+            weights = proj / (norms.unsqueeze(-1) + 1e-8)
+        else:
+            norms = torch.sum(proj.abs(), dim=2)  # (B, k)
+            weights = torch.sign(proj)
+        return norms, weights
+
+    def __call__(self, x, idx=None, weights=None):
+        """
+        Args:
+            x:       (D,) or (B, D) - current estimate(s)
+            idx:     optional (b,) constraint subset
+            weights: optional (b,) per-constraint weights
+        Returns:
+            loss: scalar or (B,)
+            grad: (D,) or (B, D) gradient
+        """
+        W, W_mus, y = self.W, self.W_mus, self.y
+        if idx is not None:
+            W, W_mus, y = W[idx], W_mus[idx], y[:, idx]
+        c = 1.0 if weights is None else weights
+
+        k, r, D = W.shape
+        X = _as_queries(x)  # (B, D)
+        norms, norm_grads = self._project(X, W, W_mus)
+
+        delta = norms - y  # (B, k)
+        self.last_delta = delta
+        loss = 0.5 * torch.sum(c * delta ** 2, dim=1)
+
+        # Gradient contribution from each component
+        grad_components = (c * delta).unsqueeze(-1) * norm_grads  # (B, k, r)
+        grad = grad_components.reshape(-1, k * r) @ W.reshape(k * r, D)  # (B, D)
+
+        return _unbatch(x, loss, grad)
+
+    def residuals(self, x, jacobian=True):
+        """
+        Residuals ||W_k (x - mu_k)|| - y_k and their Jacobian, the norm
+        derivative projected back through W_k.
+
+        Returns:
+            delta: (B, k)
+            J:     (B, k, D), or None
+        """
+        norms, norm_grads = self._project(_as_queries(x), self.W, self.W_mus)
+        if not jacobian:
+            return norms - self.y, None
+        return norms - self.y, torch.einsum('bkr,krd->bkd', norm_grads, self.W)
+
+
+class HyperplaneLoss:
+    _per_constraint = ('W', 'b')
+
+    def __init__(self, W, b, y, activation='abs'):
+        """
+        Loss on the outputs act(w_k . x + b_k) of a layer of linear units.
+
+        With act = |.| each output is ||w_k|| times the distance from x to the
+        hyperplane w_k . x + b_k = 0, i.e. the Mahalanobis distance of a
+        degenerate Gaussian with rank-one precision w_k w_k^T centered on that
+        hyperplane. With 'relu' a zero output only bounds x to the negative
+        side of its hyperplane and contributes no gradient there.
+
+        Args:
+            W:          (k, D)         - unit weights
+            b:          (k,)           - unit biases
+            y:          (k,) or (B, k) - observed unit outputs
+            activation: 'abs', 'relu' or 'identity'
+        """
+        if activation not in ('abs', 'relu', 'identity'):
+            raise ValueError("activation must be 'abs', 'relu' or 'identity'")
+        self.W = W
+        self.b = b
+        self.y = y.view(-1, y.shape[-1])                    # (1 or B, k)
+        self.activation = activation
+
+    def _outputs(self, X, W, b):
+        """Unit outputs (B, k) and their derivatives w.r.t. the pre-activations (B, k)."""
+        z = X @ W.T + b
+        if self.activation == 'abs':
+            return z.abs(), torch.sign(z)
+        if self.activation == 'relu':
+            return z.clamp(min=0.0), (z > 0).to(z.dtype)
+        return z, torch.ones_like(z)
+
+    def __call__(self, x, idx=None, weights=None):
+        W, b, y = self.W, self.b, self.y
+        if idx is not None:
+            W, b, y = W[idx], b[idx], y[:, idx]
+        c = 1.0 if weights is None else weights
+
+        X = _as_queries(x)                                  # (B, D)
+        d, slopes = self._outputs(X, W, b)
+        delta = d - y
+        self.last_delta = delta
+        grad = (c * delta * slopes) @ W                     # (B, D)
+        loss = 0.5 * torch.sum(c * delta**2, dim=1)
+        return _unbatch(x, loss, grad)
+
+    def residuals(self, x, jacobian=True):
+        """
+        Residuals act(w_k . x + b_k) - y_k and their Jacobian act'(.) w_k.
+
+        Returns:
+            delta: (B, k)
+            J:     (B, k, D), or None
+        """
+        d, slopes = self._outputs(_as_queries(x), self.W, self.b)
+        if not jacobian:
+            return d - self.y, None
+        return d - self.y, slopes.unsqueeze(-1) * self.W
+
+
+# --- Sharded evaluation ---
+
+def _share_memory(obj):
+    for value in vars(obj).values():
+        if isinstance(value, EllipsoidBank):
+            _share_memory(value)
+        elif isinstance(value, torch.Tensor):
+            value.share_memory_()
+
+
+def _shard_worker(rank, start, end, shard, buffers, barriers, n_active, stop, errors, threads, cpus):
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+    torch.set_num_threads(threads)
+    x_buf, rows_buf, loss_buf, grad_buf, delta_buf = buffers
+    start_barrier, done_barrier = barriers
+    with torch.no_grad():
+        while True:
+            try:
+                start_barrier.wait()
+            except threading.BrokenBarrierError:
+                return  # the parent shut down
+            if stop.value:
+                return
+            try:
+                B = n_active.value
+                sub = select_queries(shard, rows_buf[:B])
+                loss, grad = sub(x_buf[:B])
+                loss_buf[rank, :B] = loss
+                grad_buf[rank, :B] = grad
+                delta_buf[:B, start:end] = sub.last_delta
+            except Exception:
+                # Report to the parent, then wake it and every other worker
+                errors.put((rank, traceback.format_exc()))
+                start_barrier.abort()
+                done_barrier.abort()
+                return
+            try:
+                done_barrier.wait()
+            except threading.BrokenBarrierError:
+                return
+
+
+class ShardedLoss:
+    def __init__(self, criterion, num_workers, threads_per_worker=None, pin=False, max_queries=None,
+                 timeout=600.0):
+        """
+        Manual loss evaluated by worker processes that each own a contiguous
+        slice of the k constraints.
+
+        The constraint tensors are moved to shared memory and the workers are
+        forked, so each one reads its slice in place. Per call the parent
+        writes the queries to a shared buffer and releases the workers with a
+        barrier; each writes its partial loss and gradient sums and its
+        residuals to shared output buffers, and the parent reduces them. The
+        only IPC per call is two barrier waits.
+
+        If a worker fails, or a call is interrupted or exceeds timeout, both
+        barriers are aborted and the workers terminated; a worker's traceback
+        is raised in the parent as a RuntimeError.
+
+        Requires CPU tensors and the 'fork' start method. Constraint
+        subsampling (idx, weights) is not supported. Call close() (or use it
+        as a context manager) to stop the workers.
+
+        Args:
+            criterion:          SphericalLoss, EllipticalLoss, PrincipalComponentLoss or HyperplaneLoss
+            num_workers:        worker processes, e.g. one per socket
+            threads_per_worker: intra-op threads per worker (default: threads / workers)
+            pin:                pin worker i to the i-th contiguous block of the
+                                allowed CPUs (one socket each when cores are
+                                numbered socket by socket)
+            max_queries:        capacity of the shared query buffer
+                                (default: the number of target rows)
+            timeout:            seconds a barrier wait may take before the
+                                workers are presumed dead, or None
+        """
+        # The first per-constraint tensor (mus, or W for HyperplaneLoss) is (k, D)
+        constraints = getattr(criterion, criterion._per_constraint[0])
+        if constraints.device.type != 'cpu':
+            raise ValueError("ShardedLoss needs CPU tensors")
+        ctx = mp.get_context('fork')
+        k, D = criterion.y.shape[-1], constraints.shape[-1]
+        max_queries = max_queries or criterion.y.shape[0]
+        self.y = criterion.y
+        self.rows = None
+
+        _share_memory(criterion)
+        bounds = [(k * i // num_workers, k * (i + 1) // num_workers) for i in range(num_workers)]
+        shards = [select_constraints(criterion, slice(start, end)) for start, end in bounds]
+
+        self.x_buf = torch.zeros(max_queries, D).share_memory_()
+        self.rows_buf = torch.zeros(max_queries, dtype=torch.long).share_memory_()
+        self.loss_buf = torch.zeros(num_workers, max_queries).share_memory_()
+        self.grad_buf = torch.zeros(num_workers, max_queries, D).share_memory_()
+        self.delta_buf = torch.zeros(max_queries, k).share_memory_()
+        self.n_active = ctx.Value('i', 0)
+        self.stop = ctx.Value('b', 0)
+        self.start_barrier = ctx.Barrier(num_workers + 1)
+        self.done_barrier = ctx.Barrier(num_workers + 1)
+        self.errors = ctx.SimpleQueue()
+        self.timeout = timeout
+
+        threads = threads_per_worker or max(1, torch.get_num_threads() // num_workers)
+        cpus = sorted(os.sched_getaffinity(0)) if pin else None
+        buffers = (self.x_buf, self.rows_buf, self.loss_buf, self.grad_buf, self.delta_buf)
+        self.workers = []
+        for i, (start, end) in enumerate(bounds):
+            cpu_set = cpus[len(cpus) * i // num_workers:len(cpus) * (i + 1) // num_workers] if pin else None
+            worker = ctx.Process(
+                target=_shard_worker,
+                args=(i, start, end, shards[i], buffers, (self.start_barrier, self.done_barrier),
+                      self.n_active, self.stop, self.errors, threads, cpu_set),
+                daemon=True,
+            )
+            worker.start()
+            self.workers.append(worker)
+
+    def __call__(self, x, idx=None, weights=None):
+        if idx is not None or weights is not None:
+            raise ValueError("ShardedLoss evaluates every constraint; subsampling is not supported")
+        X = _as_queries(x)
+        B = X.shape[0]
+        if B > self.x_buf.shape[0]:
+            raise ValueError(f"{B} queries exceed the shared buffer ({self.x_buf.shape[0]}); raise max_queries")
+
+        self.x_buf[:B] = X
+        self.rows_buf[:B] = torch.arange(B) if self.rows is None else self.rows
+        self.n_active.value = B
+        try:
+            self.start_barrier.wait(self.timeout)
+            self.done_barrier.wait(self.timeout)
+        except threading.BrokenBarrierError:
+            self._terminate()
+            raise self._worker_error() from None
+        except BaseException:  # e.g. KeyboardInterrupt while the workers run
+            self._terminate()
+            raise
+
+        self.last_delta = self.delta_buf[:B].clone()
+        loss = self.loss_buf[:, :B].sum(0)
+        grad = self.grad_buf[:, :B].sum(0)
+        return _unbatch(x, loss, grad)
+
+    def _worker_error(self):
+        if self.errors.empty():
+            return RuntimeError(f"ShardedLoss workers did not respond within {self.timeout}s")
+        rank, tb = self.errors.get()
+        return RuntimeError(f"ShardedLoss worker {rank} failed:\n{tb}")
+
+    def _terminate(self):
+        """Abort both barriers so nobody stays blocked, then kill and reap the workers."""
+        self.start_barrier.abort()
+        self.done_barrier.abort()
+        for worker in self.workers:
+            if worker.is_alive():
+                worker.terminate()
+        for worker in self.workers:
+            worker.join()
+        self.workers.clear()
+
+    def close(self):
+        if not self.workers:
+            return
+        self.stop.value = 1
+        try:
+            self.start_barrier.wait(self.timeout)
+        except threading.BrokenBarrierError:
+            self._terminate()
+            return
+        for worker in self.workers:
+            worker.join(self.timeout)
+        self._terminate()  # reaps any worker that did not exit in time
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# For spherical intersection
+class SphericalIntersectionLoss(nn.Module):
+    def __init__(self, centroids, y):
+        """
+        Spherical (Euclidean) distance loss from x to a set of centroids.
+
+        Args:
+            centroids (Tensor): shape (k, D)
+            y (Tensor): shape (k,) or (k, 1), the true distances from x_true to each centroid
+        """
+        super().__init__()
+        self.centroids = centroids  # (k, D)
+        self.y = y.view(-1, 1)      # (k, 1)
+
+    def forward(self, x):
+        # x: shape (D,) or (1, D)
+        x = x.view(-1)  # Ensure shape (D,)
+        diffs = self.centroids - x  # (k, D)
+        d_est = torch.norm(diffs, dim=1, keepdim=True)  # (k, 1)
+        loss = 0.5 * torch.sum((d_est - self.y) ** 2)
+        return loss
+
+# --- Custom Mahalanobis Loss ---
+# For elliptical intersection
+class EllipticalIntersectionLoss(nn.Module):
+    def __init__(self, mus, inv_Sigmas, y):
+        super().__init__()
+        self.mus = mus  # (k, D)
+        self.inv_Sigmas = inv_Sigmas  # (k, D, D) or EllipsoidBank
+        self.y = y.view(-1, 1)  # (k, 1)
+
+    def forward(self, x):
+        # x: shape (D,)
+        diffs = x - self.mus  # (k, D)
+        if isinstance(self.inv_Sigmas, EllipsoidBank):
+            d_squared = self.inv_Sigmas.mahalanobis_squared(diffs).unsqueeze(1)
+        else:
+            d_squared = torch.einsum('ki,kij,kj->k', diffs, self.inv_Sigmas, diffs).unsqueeze(1)
+        d = torch.sqrt(d_squared + 1e-8)
+        loss = 0.5 * torch.sum((d - self.y) ** 2)
+        # loss = 0.5 * torch.sum((d_squared - y**2)**2 / (4 * (d_squared + 1e-8)))
+        return loss
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import weakref
+import torch
+from .ellipsoids import ProceduralEllipsoidBank
+
+# bank -> fingerprint; banks are not modified after construction, so the
+# digest of a bank object is computed once and dropped along with the bank
+_fingerprints = weakref.WeakKeyDictionary()
+
+
+def bank_fingerprint(bank):
+    """
+    Content hash identifying a bank, memoized per bank object.
+
+    Procedural banks are described by (k, D, seed), the generator index of
+    each ellipsoid (a subset keeps the indices of the parent bank) and the
+    device, since CPU and CUDA generators draw different streams from the same
+    seed. Stored banks are hashed over the bytes of their stored tensors,
+    which for k=1024, D=784 is over a gigabyte, hence the memo.
+    """
+    fingerprint = _fingerprints.get(bank)
+    if fingerprint is None:
+        fingerprint = _fingerprints[bank] = _compute_fingerprint(bank)
+    return fingerprint
+
+
+def _compute_fingerprint(bank):
+    h = hashlib.sha256()
+    if isinstance(bank, ProceduralEllipsoidBank):
+        h.update(json.dumps({'procedural': True, 'k': bank.k, 'D': bank.D, 'seed': bank.seed,
+                             'device': bank.device.type}).encode('utf-8'))
+        h.update(bank.ids.detach().cpu().to(torch.int64).contiguous().numpy().tobytes())
+        return h.hexdigest()
+    h.update(json.dumps({'k': bank.k, 'D': bank.D, 'dtype': str(bank.mus.dtype)}).encode('utf-8'))
+    names = ('mus', 'packed_L', 'packed_V', 'tau', 'signs', 'eigvals')
+    for t in (getattr(bank, name) for name in names if getattr(bank, name, None) is not None):
+        t = t.detach().cpu().contiguous()
+        for start in range(0, t.shape[0], 64):
+            h.update(t[start:start + 64].numpy().tobytes())
+    return h.hexdigest()
+
+
+def randomized_principal_components(bank, r, oversample=10, power_iters=2, generator=None,
+                                    tol=1e-3, max_power_iters=10):
+    """
+    Top r eigenpairs of every covariance by randomized subspace iteration.
+
+    Works from the covariance factors, Sigma = F F^T + s I (the Cholesky factor
+    of a stored bank, or A with s = 0.5 for a procedural one), so Sigma is never
+    formed and no full decomposition is computed. Each ellipsoid costs
+    O(D^2 (r + oversample)) per pass instead of the O(D^3) of eigh.
+
+    Subspace iteration converges at the rate of the spectral gap
+    lambda_{l+1} / lambda_r, which is close to 1 for flat spectra such as that
+    of A A^T + 0.5 I. Results are therefore checked: after power_iters passes,
+    iteration continues until every ||Sigma v - lambda v|| / lambda <= tol, up
+    to max_power_iters passes, and a chunk that still misses tol falls back to
+    an exact eigh of its covariances.
+
+    Args:
+        bank:           EllipsoidBank
+        r:              number of eigenpairs to keep
+        oversample:     extra subspace columns beyond r
+        power_iters:    subspace (power) iterations before the first check
+        generator:      optional torch.Generator for the starting subspace
+        tol:            accepted relative eigenpair residual
+        max_power_iters: iteration cap before falling back to eigh
+
+    Returns:
+        V:         (k, r, D) - top principal components, largest first
+        Lambda:    (k, r)    - corresponding eigenvalues
+        residuals: (k, r)    - ||Sigma v - lambda v|| for every eigenpair
+    """
+    l = min(r + oversample, bank.D)
+    V, Lambda, residuals = [], [], []
+    for start, end in bank.chunks():
+        F, shift = bank.covariance_factors(start, end)
+
+        def apply_sigma(X):
+            return torch.matmul(F, torch.matmul(F.transpose(-1, -2), X)) + shift * X
+
+        def rayleigh_ritz(Q):
+            SQ = apply_sigma(Q)                                         # (c, D, l)
+            eigvals, U = torch.linalg.eigh(Q.transpose(-1, -2) @ SQ)    # ascending
+            eigvals, U = eigvals[:, -r:].flip(-1), U[:, :, -r:].flip(-1)
+            vecs = Q @ U                                                # (c, D, r)
+            return vecs, eigvals, torch.norm(SQ @ U - vecs * eigvals.unsqueeze(1), dim=1)
+
+        Q = torch.randn(end - start, bank.D, l, device=F.device, dtype=F.dtype, generator=generator)
+        Q, _ = torch.linalg.qr(apply_sigma(Q))
+        for _ in range(power_iters):
+            Q, _ = torch.linalg.qr(apply_sigma(Q))
+        vecs, eigvals, res = rayleigh_ritz(Q)
+        for _ in range(power_iters, max_power_iters):
+            if (res / eigvals.clamp(min=1e-30)).max() <= tol:
+                break
+            Q, _ = torch.linalg.qr(apply_sigma(Q))
+            vecs, eigvals, res = rayleigh_ritz(Q)
+
+        if (res / eigvals.clamp(min=1e-30)).max() > tol:
+            eigvals, U = torch.linalg.eigh(bank.covariances(start, end))
+            eigvals, vecs = eigvals[:, -r:].flip(-1), U[:, :, -r:].flip(-1)
+            res = torch.zeros_like(eigvals)
+        V.append(vecs.transpose(-1, -2))
+        Lambda.append(eigvals)
+        residuals.append(res)
+    return torch.cat(V), torch.cat(Lambda), torch.cat(residuals)
+
+
+class PCACache:
+    def __init__(self, root, max_bytes=8 << 30, store_rank=None, solver='eigh'):
+        """
+        Content-addressed on-disk cache of per-ellipsoid top-r eigenpairs.
+
+        Entries are keyed by a hash of the bank (or of caller-supplied bank
+        parameters) and stored with their rank. A request for rank r is served
+        by slicing any cached entry of rank >= r for the same key, so a sweep
+        over n_pca costs a single decomposition. Least recently used entries
+        are evicted once the cache exceeds max_bytes.
+
+        Args:
+            root:       cache directory
+            max_bytes:  size cap for all entries together
+            store_rank: rank to compute and store on a miss, if larger than
+                        the requested one (eigh yields every eigenpair anyway)
+            solver:     'eigh' or 'randomized'; part of the cache key
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.store_rank = store_rank
+        self.solver = solver
+        os.makedirs(root, exist_ok=True)
+
+    def _entries(self, key=None):
+        """(path, key, rank) for every cached entry, optionally for one key."""
+        entries = []
+        for name in os.listdir(self.root):
+            if not name.endswith('.pt'):
+                continue
+            entry_key, _, rank = name[:-3].rpartition('_r')
+            if key is None or entry_key == key:
+                entries.append((os.path.join(self.root, name), entry_key, int(rank)))
+        return entries
+
+    def _evict(self, keep):
+        entries = sorted(self._entries(), key=lambda e: os.path.getmtime(e[0]))
+        total = sum(os.path.getsize(path) for path, _, _ in entries)
+        for path, _, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            total -= os.path.getsize(path)
+            os.remove(path)
+
+    def principal_components(self, bank, r, params=None):
+        """
+        Top r eigenpairs of every covariance in bank, from the cache if possible.
+
+        Args:
+            bank:   EllipsoidBank
+            r:      requested rank
+            params: optional dict of bank parameters to key on instead of the
+                    bank contents
+
+        Returns:
+            V:      (k, r, D) - top principal components, largest first
+            Lambda: (k, r)    - corresponding eigenvalues
+        """
+        if params is not None:
+            key = hashlib.sha256(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+        else:
+            key = bank_fingerprint(bank)
+        key = f"{self.solver}-{key}"
+
+        hits = sorted((e for e in self._entries(key) if e[2] >= r), key=lambda e: e[2])
+        if hits:
+            path = hits[0][0]
+            os.utime(path)  # mark as recently used
+            entry = torch.load(path, map_location=bank.mus.device)
+            return entry['V'][:, :r], entry['Lambda'][:, :r]
+
+        rank = max(r, self.store_rank or 0)
+        if self.solver == 'randomized':
+            V, Lambda, _ = randomized_principal_components(bank, rank)
+        else:
+            V, Lambda = bank.principal_components(rank)
+        path = os.path.join(self.root, f"{key}_r{rank}.pt")
+        torch.save({'V': V.cpu(), 'Lambda': Lambda.cpu()}, path)
+
+        # Lower-rank entries for this key are now redundant
+        for old_path, _, old_rank in self._entries(key):
+            if old_rank < rank:
+                os.remove(old_path)
+        self._evict(keep=path)
+        return V[:, :r], Lambda[:, :r]
@@ -0,0 +1,754 @@
+import contextlib
+import functools
+import json
+import os
+import queue
+import threading
+import time
+import torch
+import torch.nn as nn
+import torch.optim as optim
+import random
+from .tensorfile import write_tensors, read_tensors
+
+# torchvision and matplotlib are imported inside the functions that use them,
+# so importing Timer or the profiler does not pay their startup cost.
+
+class Timer:
+    def __init__(self):
+        self.start_time = time.time()
+        self.last_tick = self.start_time
+    
+    def tick(self):
+        now = time.time()
+        tick = now - self.last_tick
+        self.last_tick = now
+        return tick
+    
+    def elapsed(self):
+        return time.time() - self.start_time
+
+
+class _Section:
+    __slots__ = ('profiler', 'name', 'path', 'start', 'mem')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        p = self.profiler
+        p._stack.append(self.name)
+        self.path = '/'.join(p._stack)
+        if self.path not in p._durations:  # keep report rows in first-entry order
+            p._durations[self.path], p._mem[self.path] = [], []
+        self.mem = p._memory() if p.track_memory else 0
+        if p.sync_cuda:
+            torch.cuda.synchronize()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        p = self.profiler
+        if p.sync_cuda:
+            torch.cuda.synchronize()
+        end = time.perf_counter_ns()
+        mem_delta = p._memory() - self.mem if p.track_memory else 0
+        p._stack.pop()
+        p._record(self.path, self.name, self.start, end, mem_delta)
+        return False
+
+
+class Profiler(Timer):
+    def __init__(self, enabled=True, track_memory=True, sync_cuda=False, max_events=1_000_000, memory=None):
+        """
+        Hierarchical section profiler.
+
+        Sections nest: a section opened inside another is recorded under the
+        path 'outer/inner'. Every path keeps its call count and durations
+        (min, mean, p99 in the report) and the mean and max change in
+        allocated memory (CUDA allocator bytes or process RSS). Individual
+        calls are also kept as Chrome trace events, up to max_events.
+
+        When disabled, section() returns a shared no-op context manager and
+        profiled functions are called directly, so instrumentation can stay
+        in hot loops.
+
+        Args:
+            enabled:      record sections
+            track_memory: sample allocated memory on entry and exit
+            sync_cuda:    synchronize CUDA around sections so durations cover
+                          device work rather than kernel launches
+            max_events:   cap on stored trace events
+            memory:       'cuda' (allocator bytes) or 'rss' (process resident
+                          set); None picks 'cuda' if CUDA is available
+        """
+        super().__init__()
+        self.enabled = enabled
+        self.track_memory = track_memory
+        self.sync_cuda = sync_cuda and torch.cuda.is_available()
+        self.max_events = max_events
+        if memory is None:
+            memory = 'cuda' if torch.cuda.is_available() else 'rss'
+        if memory not in ('cuda', 'rss'):
+            raise ValueError("memory must be 'cuda' or 'rss'")
+        self.memory = memory
+        self.reset()
+
+    def reset(self):
+        self._stack = []
+        self._durations = {}  # path -> [ns]
+        self._mem = {}        # path -> [bytes]
+        self._events = []
+        self._origin = time.perf_counter_ns()
+
+    def _memory(self):
+        if self.memory == 'cuda':
+            return torch.cuda.memory_allocated()
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * _PAGE_SIZE
+        except OSError:
+            return 0
+
+    def _record(self, path, name, start, end, mem_delta):
+        self._durations[path].append(end - start)
+        self._mem[path].append(mem_delta)
+        if len(self._events) < self.max_events:
+            self._events.append((name, path, start, end, mem_delta))
+
+    def section(self, name):
+        """Context manager timing the enclosed block as section name."""
+        if not self.enabled:
+            return _NULL_SECTION
+        return _Section(self, name)
+
+    def profile(self, name=None):
+        """Decorator timing every call of a function as a section (default: its qualified name)."""
+        def decorator(fn):
+            label = name or fn.__qualname__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _Section(self, label):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        """Per-path statistics: count, total/min/mean/p99 seconds and mean/max memory delta in bytes."""
+        out = {}
+        for path, durations in self._durations.items():
+            ordered = sorted(durations)
+            mem = self._mem[path]
+            out[path] = {
+                'count': len(ordered),
+                'total': sum(ordered) / 1e9,
+                'min': ordered[0] / 1e9,
+                'mean': sum(ordered) / len(ordered) / 1e9,
+                'p99': ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))] / 1e9,
+                'mem_mean': sum(mem) / len(mem),
+                'mem_max': max(mem),
+            }
+        return out
+
+    def report(self):
+        """Table of stats() in first-entry order, indented by nesting depth."""
+        lines = [f"{'section':<48} {'count':>8} {'total s':>10} {'min ms':>10} {'mean ms':>10} {'p99 ms':>10} {'mem MiB':>9}"]
+        for path, st in self.stats().items():
+            depth = path.count('/')
+            label = '  ' * depth + path.rsplit('/', 1)[-1]
+            lines.append(f"{label:<48} {st['count']:>8d} {st['total']:>10.3f} {st['min'] * 1e3:>10.3f} "
+                         f"{st['mean'] * 1e3:>10.3f} {st['p99'] * 1e3:>10.3f} {st['mem_max'] / 2**20:>9.1f}")
+        return '\n'.join(lines)
+
+    def export_chrome_trace(self, path):
+        """Write the recorded sections as Chrome trace JSON (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        events = [{
+            'name': name,
+            'cat': section_path,
+            'ph': 'X',
+            'ts': (start - self._origin) / 1e3,
+            'dur': (end - start) / 1e3,
+            'pid': pid,
+            'tid': 0,
+            'args': {'mem_delta': mem_delta},
+        } for name, section_path, start, end, mem_delta in self._events]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+_NULL_SECTION = contextlib.nullcontext()
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+# Shared profiler used to instrument the library and experiment scripts;
+# disabled unless a script enables it.
+profiler = Profiler(enabled=False)
+
+# Sampler class for random batch sampling
+class Sampler:
+    def __init__(self, data, labels, batch_size, device='cuda', mode='random', prefetch=0):
+        """
+        Mini-batch sampler over a dataset held in tensors.
+
+        Modes:
+            'random':   indices drawn with replacement on every step
+            'epoch':    a fresh permutation per epoch, consumed batch_size at a
+                        time without replacement
+            'shuffled': the data is permuted into a second, preallocated copy
+                        once per epoch and batches are contiguous slices (views)
+                        of it, so a step does no gather and no allocation. Costs
+                        one extra copy of the data; a batch is only valid until
+                        the next epoch starts.
+
+        In 'epoch' and 'shuffled' mode the last partial batch of an epoch is
+        dropped, so every batch has the same shape.
+
+        Args:
+            prefetch: for 'random' and 'epoch', the number of batches a
+                      background thread assembles ahead into preallocated,
+                      reused buffers; a returned batch is valid until the next
+                      sample() call. 0 gathers synchronously on every call.
+        """
+        if mode not in ('random', 'epoch', 'shuffled'):
+            raise ValueError(f"Unknown mode '{mode}'. Use 'random', 'epoch' or 'shuffled'.")
+        if mode == 'shuffled' and prefetch:
+            raise ValueError("'shuffled' batches are slices and need no prefetching")
+        self.data = data
+        self.labels = labels
+        self.batch_size = batch_size
+        self.device = device
+        self.num_samples = data.size(0)
+        self.mode = mode
+        self.epoch = 0
+        self._perm = None
+        self._pos = 0
+        self._thread = None
+
+        # The default mode keeps drawing from the global RNG; the others own a
+        # generator (seeded from it) so a prefetch thread does not race the
+        # main thread for random state.
+        self.generator = None
+        if mode != 'random' or prefetch:
+            self.generator = torch.Generator(device=data.device)
+            self.generator.manual_seed(int(torch.randint(2 ** 62, (1,))))
+        if mode == 'shuffled':
+            self._shuffled_data = torch.empty_like(data)
+            self._shuffled_labels = torch.empty_like(labels)
+        if prefetch:
+            self._start_prefetch(prefetch)
+
+    def _next_indices(self):
+        B = self.batch_size
+        if self.mode == 'random':
+            return torch.randint(0, self.num_samples, (B,), device=self.data.device, generator=self.generator)
+        if self._perm is None or self._pos + B > self.num_samples:
+            self._perm = torch.randperm(self.num_samples, device=self.data.device, generator=self.generator)
+            self._pos = 0
+            self.epoch += 1
+        idx = self._perm[self._pos:self._pos + B]
+        self._pos += B
+        return idx
+
+    def _next_slice(self):
+        B = self.batch_size
+        if self._perm is None or self._pos + B > self.num_samples:
+            self._perm = torch.randperm(self.num_samples, device=self.data.device, generator=self.generator)
+            torch.index_select(self.data, 0, self._perm, out=self._shuffled_data)
+            torch.index_select(self.labels, 0, self._perm, out=self._shuffled_labels)
+            self._pos = 0
+            self.epoch += 1
+        batch = slice(self._pos, self._pos + B)
+        self._pos += B
+        return self._shuffled_data[batch], self._shuffled_labels[batch]
+
+    def _start_prefetch(self, prefetch):
+        # prefetch slots being filled or waiting, plus the one the caller holds
+        n_slots = prefetch + 1
+        B = self.batch_size
+        self._slots = [(torch.empty((B,) + tuple(self.data.shape[1:]), dtype=self.data.dtype, device=self.data.device),
+                        torch.empty((B,) + tuple(self.labels.shape[1:]), dtype=self.labels.dtype, device=self.labels.device))
+                       for _ in range(n_slots)]
+        self._free = queue.Queue()
+        for slot in range(n_slots):
+            self._free.put(slot)
+        self._ready = queue.Queue()
+        self._in_use = None
+        self._stop = threading.Event()
+
+        # On CUDA the producer fills buffers on its own stream. Events order a
+        # fill before the consumer's reads and the consumer's reads before the
+        # buffer is refilled.
+        self._stream = torch.cuda.Stream(self.data.device) if self.data.device.type == 'cuda' else None
+        self._released = [None] * n_slots
+        self._thread = threading.Thread(target=self._producer, daemon=True)
+        self._thread.start()
+
+    def _producer(self):
+        try:
+            with torch.cuda.stream(self._stream) if self._stream is not None else contextlib.nullcontext():
+                while not self._stop.is_set():
+                    try:
+                        slot = self._free.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    if self._released[slot] is not None:
+                        self._stream.wait_event(self._released[slot])
+                    data, labels = self._slots[slot]
+                    idx = self._next_indices()
+                    torch.index_select(self.data, 0, idx, out=data)
+                    torch.index_select(self.labels, 0, idx, out=labels)
+                    filled = None
+                    if self._stream is not None:
+                        filled = torch.cuda.Event()
+                        filled.record(self._stream)
+                    self._ready.put((slot, filled))
+        except Exception as e:
+            self._ready.put((None, e))
+
+    def _sample_prefetched(self):
+        if self._in_use is not None:
+            if self._stream is not None:
+                self._released[self._in_use] = torch.cuda.Event()
+                self._released[self._in_use].record()
+            self._free.put(self._in_use)
+            self._in_use = None
+        slot, filled = self._ready.get()
+        if slot is None:
+            raise RuntimeError("batch prefetch thread failed") from filled
+        if filled is not None:
+            torch.cuda.current_stream(self.data.device).wait_event(filled)
+        self._in_use = slot
+        return self._slots[slot]
+
+    def sample(self, batch_size=None):
+        if batch_size is None:
+            batch_size = self.batch_size
+        if (self.mode == 'random' and self._thread is None) or batch_size != self.batch_size:
+            if self.mode != 'random':
+                raise ValueError(f"'{self.mode}' mode only serves batches of {self.batch_size}")
+            # Synchronous draw from the global RNG; the generator may belong to the prefetch thread
+            indices = torch.randint(0, self.num_samples, (batch_size,), device=self.device)
+            inputs = self.data[indices]
+            targets = self.labels[indices]
+            return inputs, targets
+        if self._thread is not None:
+            return self._sample_prefetched()
+        if self.mode == 'shuffled':
+            return self._next_slice()
+        indices = self._next_indices()
+        return self.data[indices], self.labels[indices]
+
+    def close(self):
+        """Stop the prefetch thread, if any."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def all(self):
+        return self.data, self.labels
+
+# Visualization function
+def visualize_gaussian_components(model, data_samples, targets=None):
+    import matplotlib.pyplot as plt
+
+    # Project data samples to the same latent space as the means
+    with torch.no_grad():
+        projected_data = model(data_samples)
+    variances = model.variances()
+
+    plt.figure(figsize=(8, 6))
+    if targets is not None:
+        scatter = plt.scatter(projected_data[:, 0].detach().cpu().numpy(), 
+                              projected_data[:, 1].detach().cpu().numpy(), 
+                              c=targets.detach().cpu().numpy(), cmap='tab10', s=10, alpha=0.6, label='Projected Data Samples')
+        plt.colorbar(scatter, label='Target Class')
+    else:
+        plt.scatter(projected_data[:, 0].detach().cpu().numpy(), projected_data[:, 1].detach().cpu().numpy(), s=10, alpha=0.6, label='Projected Data Samples')
+    # plt.scatter(means.detach().cpu().numpy(), 
+    #             np.zeros_like(means.detach().cpu().numpy()), 
+    #             color='red', marker='x', s=100, label='Gaussian Means')
+    plt.title('Visualization of Gaussian Components in Latent Space')
+    plt.xlabel('Latent Dimension 1')
+    plt.ylabel('Latent Dimension 2')
+    plt.legend()
+    plt.show()
+
+# Cosine similarity visualization function
+def plot_cosine_similarity_histogram(model):
+    import matplotlib.pyplot as plt
+
+    weight_vectors = model.linear.weight.detach()
+    cosine_similarities = []
+    for i in range(weight_vectors.size(0)):
+        for j in range(i + 1, weight_vectors.size(0)):
+            cos_sim = torch.nn.functional.cosine_similarity(weight_vectors[i].unsqueeze(0), weight_vectors[j].unsqueeze(0)).item()
+            cosine_similarities.append(cos_sim)
+
+    plt.figure(figsize=(8, 6))
+    plt.hist(cosine_similarities, bins=50, alpha=0.75, color='blue')
+    plt.title('Histogram of Cosine Similarities Between Weight Vectors')
+    plt.xlabel('Cosine Similarity')
+    plt.ylabel('Frequency')
+    plt.show()
+
+class Abs(nn.Module):
+    def forward(self, x):
+        return torch.abs(x)
+
+class OffsetClassifierModel(nn.Module):
+    def __init__(self, input_model, output_dim, latent_dim, activation=nn.ReLU()):
+        super(OffsetClassifierModel, self).__init__()
+        self.input_model = input_model
+        self.bias_offsets = nn.Parameter(torch.zeros(output_dim, latent_dim))
+        self.activation = activation
+        self.linear = nn.Linear(latent_dim*output_dim, output_dim)
+
+    def forward(self, x):
+        with torch.no_grad():
+            x = self.input_model(x)
+        x = x.unsqueeze(1) + self.bias_offsets
+        x = x.flatten(-2)
+        x = self.activation(x)
+        x = self.linear(x)
+        return x
+
+class SimpleClassifierModel2(nn.Module):
+    def __init__(self, input_model, output_dim, latent0_dim, activation=nn.ReLU()):
+        super(SimpleClassifierModel2, self).__init__()
+        for param in input_model.parameters():
+            param.requires_grad = False
+        self.model = nn.Sequential(
+            input_model,
+            activation,
+            nn.Linear(latent0_dim, output_dim),
+        )
+    def forward(self, x):
+        return self.model(x)
+
+class SimpleClassifierModel3(nn.Module):
+    def __init__(self, input_model, output_dim, latent0_dim, latent1_dim, activation=nn.ReLU()):
+        super(SimpleClassifierModel3, self).__init__()
+        for param in input_model.parameters():
+            param.requires_grad = False
+        self.model = nn.Sequential(
+            input_model,
+            activation,
+            nn.Linear(latent0_dim, latent1_dim),
+            activation,
+            nn.Linear(latent1_dim, output_dim)
+        )
+    def forward(self, x):
+        return self.model(x)
+
+class MLP2(nn.Module):
+    def __init__(self, input_dim, latent0, output_dim, activation=nn.ReLU()):
+        super(MLP2, self).__init__()
+        self.activation = activation
+        self.linear0 = nn.Linear(input_dim, latent0)
+        self.linear1 = nn.Linear(latent0, output_dim)
+        self.model = nn.Sequential(
+            self.linear0,
+            self.activation,
+            self.linear1
+        )
+
+    def forward(self, x):
+        return self.model(x)
+
+class MLP3(nn.Module):
+    def __init__(self, input_dim, latent0, latent1, output_dim, activation=nn.ReLU()):
+        super(MLP3, self).__init__()
+        self.activation = activation
+        self.linear0 = nn.Linear(input_dim, latent0)
+        self.linear1 = nn.Linear(latent0, latent1)
+        self.linear2 = nn.Linear(latent1, output_dim)
+        self.model = nn.Sequential(
+            self.linear0,
+            self.activation,
+            self.linear1,
+            self.activation,
+            self.linear2
+        )
+
+    def forward(self, x):
+        return self.model(x)
+
+def _sgd(params, lr, fused):
+    """SGD with momentum, using the fused CUDA kernel when requested and supported, else foreach."""
+    if fused:
+        try:
+            return torch.optim.SGD(params, lr=lr, momentum=0.9, fused=True)
+        except (TypeError, RuntimeError):
+            pass  # older torch, or parameters the fused kernel does not take
+    return torch.optim.SGD(params, lr=lr, momentum=0.9, foreach=True)
+
+def _chunked_accuracy(model, sampler, chunk_size):
+    """Accuracy over all of sampler's data, chunk_size samples at a time, with a single host sync."""
+    data, labels = sampler.all()
+    was_training = model.training
+    model.eval()
+    correct = torch.zeros((), dtype=torch.long, device=labels.device)
+    with torch.no_grad():
+        for i in range(0, data.size(0), chunk_size):
+            prediction = torch.argmax(model(data[i:i + chunk_size]), dim=1)
+            correct += (prediction == labels[i:i + chunk_size]).sum()
+    model.train(was_training)
+    return correct.item() / data.size(0)
+
+# Supervised training function
+def train_supervised(model, sampler, num_outputs, num_epochs=100, lr=0.001, log_every=100, device="cuda",
+                     fast=False, compile_step=True, accuracy_every=1000, accuracy_chunk=8192):
+    """
+    SGD with momentum and a StepLR schedule for num_epochs updates.
+
+    With fast=True the step is built for throughput: the forward pass and
+    loss are compiled with torch.compile, SGD uses the fused (CUDA) or
+    foreach implementation, the per-step timer is dropped and the loss is
+    summed on the device, so the log intervals are the only host syncs.
+    Fast log lines report the mean loss over the interval and steps per
+    second; the default step logs the last loss and the step time.
+
+    Args:
+        fast:           throughput-oriented training step
+        compile_step:   with fast, compile the forward pass and loss (ignored
+                        if this torch has no torch.compile)
+        accuracy_every: with fast, updates between full training-set accuracy
+                        evaluations, or None to skip them; the default step
+                        never evaluates, matching its previous cost
+        accuracy_chunk: samples per forward pass of the accuracy evaluation
+    """
+    timer = Timer()
+
+    params = [p for p in model.parameters() if p.requires_grad]
+    if fast:
+        optimizer = _sgd(params, lr, fused=torch.device(device).type == 'cuda')
+    else:
+        # optimizer = torch.optim.Adam(model.parameters(), lr=lr)
+        optimizer = torch.optim.SGD(params, lr=lr, momentum=0.9)
+    scheduler = optim.lr_scheduler.StepLR(optimizer, step_size=10000, gamma=0.9)
+    criterion = nn.CrossEntropyLoss()
+
+    def forward_loss(inputs, targets):
+        return criterion(model(inputs), targets)
+
+    if fast and compile_step and hasattr(torch, 'compile'):
+        forward_loss = torch.compile(forward_loss)
+
+    loss_sum = None  # fast only; created from the first loss so it lives where the model does
+    train_accuracy = 0
+    interval_start = 0
+
+    print('Starting supervised training')
+    timer.tick()
+    interval_time = timer.elapsed()
+    for update in range(num_epochs):
+        inputs, targets = sampler.sample()
+        optimizer.zero_grad(set_to_none=True)
+        loss = forward_loss(inputs, targets)
+        loss.backward()
+        optimizer.step()
+        scheduler.step()
+        if not fast:
+            elapsed = timer.tick()
+            if (update+1) % log_every == 0:
+                print(f"Update: {update + 1}/{num_epochs} | Loss: {loss.item():.4f} | Train Acc: {100*train_accuracy:.2f}% | Elapsed Time: {timer.elapsed():.2f}s | Step Time: {elapsed:.4f}s")
+            continue
+
+        loss_sum = loss.detach().clone() if loss_sum is None else loss_sum + loss.detach()
+        if accuracy_every and (update + 1) % accuracy_every == 0:
+            train_accuracy = _chunked_accuracy(model, sampler, accuracy_chunk)
+
+        if (update+1) % log_every == 0:
+            steps = update + 1 - interval_start
+            mean_loss = loss_sum.item() / steps  # syncs with the device
+            now = timer.elapsed()
+            steps_per_second = steps / max(now - interval_time, 1e-9)
+            loss_sum = None
+            interval_start, interval_time = update + 1, now
+            print(f"Update: {update + 1}/{num_epochs} | Loss: {mean_loss:.4f} | Train Acc: {100*train_accuracy:.2f}% | Elapsed Time: {now:.2f}s | Steps/s: {steps_per_second:.1f}")
+    print('Supervised training complete.')
+    return model
+
+def evaluate_model(model, sampler, batch_size=None, device='cuda'):
+    """
+    Evaluate a model on the entire dataset provided by the sampler.
+    
+    Args:
+        model: The model to evaluate
+        sampler: Sampler containing the evaluation data
+        batch_size: Batch size for evaluation. If None, process all data at once.
+        device: Device to run evaluation on
+        
+    Returns:
+        accuracy: Classification accuracy as a percentage
+    """
+    model.eval()  # Set model to evaluation mode
+    
+    # Get all data at once
+    data, labels = sampler.all()
+    total_samples = data.size(0)
+    
+    with torch.no_grad():  # No need to track gradients during evaluation
+        if batch_size is None:
+            # Process all data at once
+            y = model(data)
+            prediction = torch.argmax(y, dim=1)
+            correct = (prediction == labels)
+            accuracy = correct.sum().float().item() / total_samples
+        else:
+            # Process in batches
+            correct = 0
+            for i in range(0, total_samples, batch_size):
+                batch_data = data[i:i+batch_size]
+                batch_labels = labels[i:i+batch_size]
+                
+                outputs = model(batch_data)
+                predicted = torch.argmax(outputs, dim=1)
+                correct += (predicted == batch_labels).sum().float().item()
+            accuracy = correct / total_samples
+
+    return accuracy
+
+# --- Dataset tensor cache ---
+#
+# A tensorfile (see tensorfile.py) with the metadata under 'meta'. Each array
+# keeps its own dtype, so loading is zero-copy on the CPU and a single
+# host-to-device copy otherwise.
+
+TENSOR_CACHE_MAGIC = b'TNSRCCH\0'
+TENSOR_CACHE_VERSION = 1
+
+
+def save_tensors(path, tensors, **meta):
+    """
+    Write a dict of tensors plus JSON-serializable metadata to path.
+
+    The file is written under a temporary name and renamed into place, so
+    concurrent jobs never map a partially written cache.
+    """
+    write_tensors(path, TENSOR_CACHE_MAGIC, TENSOR_CACHE_VERSION, tensors, meta=meta)
+
+
+def open_tensors(path):
+    """
+    Map a file written by save_tensors.
+
+    Returns:
+        tensors: dict of CPU tensors that are views of the mapped file
+        meta:    dict of the stored metadata
+    """
+    tensors, header = read_tensors(path, TENSOR_CACHE_MAGIC, TENSOR_CACHE_VERSION)
+    return tensors, header['meta']
+
+
+def _cached_split(root, dataset, split, storage, build):
+    """
+    Flattened images and labels of one dataset split, from the cache under
+    root/tensor_cache if present, else built and cached first.
+
+    The key is the dataset, the split and the transform: images flattened to
+    (N, F) and either stored as float32 in [0, 1] ('float32') or as raw uint8
+    pixels plus the scale that maps them to [0, 1] ('uint8', 4x smaller).
+
+    Args:
+        build: () -> (pixels (N, F) uint8, labels (N,) int64), run on a miss
+
+    Returns:
+        data:   (N, F) float32 or uint8 CPU tensor mapped from the cache
+        labels: (N,) int64
+        scale:  divisor taking data to [0, 1]
+    """
+    if storage not in ('float32', 'uint8'):
+        raise ValueError(f"Unknown storage '{storage}'. Use 'float32' or 'uint8'.")
+    cache_dir = os.path.join(root, 'tensor_cache')
+    path = os.path.join(cache_dir, f"{dataset}-{split}-flat-{storage}.v{TENSOR_CACHE_VERSION}.tc")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        pixels, labels = build()
+        data = pixels if storage == 'uint8' else pixels.float() / 255.0
+        save_tensors(path, {'data': data, 'labels': labels},
+                     scale=255.0 if storage == 'uint8' else 1.0)
+    tensors, meta = open_tensors(path)
+    return tensors['data'], tensors['labels'], meta['scale']
+
+
+def _to_device(data, labels, scale, device):
+    """Move a cached split to device, expanding uint8 pixels there rather than on the host."""
+    data, labels = data.to(device), labels.to(device)
+    if data.dtype == torch.uint8:
+        data = data.float() / scale
+    return data, labels
+
+
+def load_mnist(root='e:/ml_datasets', batch_size=512, device='cuda', cache=True, storage='float32',
+               sampler_mode='random', prefetch=0):
+    """
+    Args:
+        cache:   map the flattened tensors from root/tensor_cache, building
+                 them on first use; False decodes the raw dataset every call
+        storage: cached representation, 'float32' or 'uint8'
+        sampler_mode, prefetch: passed to the training Sampler
+    """
+    def build(train):
+        from torchvision import datasets
+        mnist = datasets.MNIST(root=root, train=train, download=True)
+        return mnist.data.reshape(mnist.data.shape[0], -1), mnist.targets
+
+    splits = []
+    for split, train in (('train', True), ('test', False)):
+        if cache:
+            data, labels, scale = _cached_split(root, 'mnist', split, storage, lambda: build(train))
+        else:
+            (data, labels), scale = build(train), 255.0
+            data = data.float() / scale
+        splits.append(_to_device(data, labels, scale, device))
+    (train_data, train_labels), (test_data, test_labels) = splits
+
+    # Create samplers for both train and test
+    train_sampler = Sampler(train_data, train_labels, batch_size, device, mode=sampler_mode, prefetch=prefetch)
+    test_sampler = Sampler(test_data, test_labels, batch_size, device)
+
+    return train_sampler, test_sampler, 28*28  # Return both samplers and input dimension
+
+def load_cifar10(root='e:/ml_datasets', batch_size=512, device='cuda', cache=True, storage='float32',
+                 sampler_mode='random', prefetch=0):
+    """
+    Args:
+        cache:   map the flattened tensors from root/tensor_cache, building
+                 them on first use; False decodes the raw dataset every call
+        storage: cached representation, 'float32' or 'uint8'
+        sampler_mode, prefetch: passed to the training Sampler
+    """
+    def build(train):
+        from torchvision import datasets
+        cifar = datasets.CIFAR10(root=root, train=train, download=True)
+        # (N, H, W, C) uint8 -> (N, C*H*W), the layout ToTensor + flatten produces
+        pixels = torch.from_numpy(cifar.data).permute(0, 3, 1, 2).reshape(len(cifar.data), -1)
+        return pixels, torch.tensor(cifar.targets, dtype=torch.long)
+
+    splits = []
+    for split, train in (('train', True), ('test', False)):
+        if cache:
+            data, labels, scale = _cached_split(root, 'cifar10', split, storage, lambda: build(train))
+        else:
+            (data, labels), scale = build(train), 255.0
+            data = data.float() / scale
+        splits.append(_to_device(data, labels, scale, device))
+    (train_data, train_labels), (test_data, test_labels) = splits
+
+    # Create samplers for both train and test
+    train_sampler = Sampler(train_data, train_labels, batch_size, device, mode=sampler_mode, prefetch=prefetch)
+    test_sampler = Sampler(test_data, test_labels, batch_size, device)
+
+    return train_sampler, test_sampler, 3072  # Return both samplers and input dimension
@@ -0,0 +1,172 @@
+import time
+import torch
+from .putils import profiler
+
+# Shared iteration driver for the reconstruction solvers.
+#
+# A solver supplies one step of its update rule; solve() runs it with early
+# stopping. Estimates are a single (D,) query or a (B, D) batch of independent
+# queries, and each query stops on its own: converged rows are written out and
+# dropped, so later steps only do work for the queries still running.
+
+class StoppingCriteria:
+    def __init__(self, rel_loss_tol=None, grad_tol=None, residual_tol=None, time_budget=None, check_every=50):
+        """
+        Stopping rules; a query stops as soon as any enabled rule holds.
+
+        Checks run every check_every iterations rather than every step, since
+        each check syncs the host with the device.
+
+        Args:
+            rel_loss_tol: |L_prev - L| / |L_prev| between two checks
+            grad_tol:     gradient norm
+            residual_tol: RMS(d - y) / RMS(y), the residual RMS relative to the targets
+            time_budget:  wall-clock seconds for the whole solve
+            check_every:  iterations between checks
+        """
+        self.rel_loss_tol = rel_loss_tol
+        self.grad_tol = grad_tol
+        self.residual_tol = residual_tol
+        self.time_budget = time_budget
+        self.check_every = check_every
+
+    def converged(self, loss, prev_loss, grad, rel_residual=None):
+        """
+        Args:
+            loss:         (b,) - current losses
+            prev_loss:    (b,) - losses at the previous check, or None
+            grad:         (b, D)
+            rel_residual: (b,) - RMS(d - y) / RMS(y), or None
+
+        Returns:
+            (b,) bool mask of converged queries
+        """
+        done = torch.zeros_like(loss, dtype=torch.bool)
+        if self.rel_loss_tol is not None and prev_loss is not None:
+            done |= (prev_loss - loss).abs() <= self.rel_loss_tol * prev_loss.abs().clamp(min=1e-30)
+        if self.grad_tol is not None:
+            done |= torch.norm(grad, dim=-1) <= self.grad_tol
+        if self.residual_tol is not None and rel_residual is not None:
+            done |= rel_residual <= self.residual_tol
+        return done
+
+
+def solve(x, step, num_iters, criteria=None, state=(), y=None, x_true=None, label="", log_every=1000):
+    """
+    Run step until every query has converged, num_iters is reached or the
+    time budget runs out.
+
+    Only the active queries are passed to step. When a query converges its row
+    is written to the result and removed from x, from every tensor in state
+    and from all later steps.
+
+    Args:
+        x:         (D,) or (B, D) - initial estimate(s)
+        step:      step(X, state, t, rows) -> (X, loss, grad) advancing the
+                   active estimates X (b, D), where rows (b,) are their indices
+                   in the batch; loss is (b,) with loss = 0.5 sum_i (d_i - y_i)^2
+                   and grad is (b, D)
+        num_iters: iteration cap
+        criteria:  StoppingCriteria, or None to run all num_iters
+        state:     per-query tensors (B, ...) compacted along with x, e.g.
+                   optimizer moments; step receives them as a list
+        y:         (k,) or (B, k) targets, needed for residual_tol
+        x_true:    optional ground truth, for progress logging
+        label:     log prefix
+        log_every: iterations between progress lines, or None for none
+
+    Returns:
+        x:          final estimate(s), shaped like the input
+        iterations: (B,) iterations run by each query
+    """
+    X = x.view(-1, x.shape[-1])
+    B = X.shape[0]
+    result = X.detach().clone()
+    rows = torch.arange(B, device=X.device)
+    iterations = torch.full((B,), num_iters, dtype=torch.long)
+    state = list(state)
+    prev_loss = None
+    if y is not None:
+        y = y.view(-1, y.shape[-1])
+        k = y.shape[-1]
+        y_rms = y.pow(2).mean(-1).sqrt()                    # (1 or B,)
+    if x_true is not None:
+        x_true = x_true.view(-1, x.shape[-1])
+    start = time.perf_counter()
+
+    for t in range(1, num_iters + 1):
+        with profiler.section('step'):
+            X, loss, grad = step(X, state, t, rows)
+
+        if x_true is not None and log_every and t % log_every == 0:
+            result[rows] = X.detach()
+            err = torch.norm(x_true - result, dim=-1).mean().item()
+            print(f"{label} Iteration {t:6d}: Error = {err:.6f}, Loss = {loss.mean().item():.6f}, Active = {rows.shape[0]}")
+
+        if criteria is None or t % criteria.check_every != 0:
+            continue
+        if criteria.time_budget is not None and time.perf_counter() - start > criteria.time_budget:
+            iterations[rows.cpu()] = t
+            break
+
+        with profiler.section('check'):
+            rel_residual = None
+            if y is not None:
+                # 0.5 sum (d - y)^2 = loss, so RMS(d - y) = sqrt(2 loss / k)
+                rel_residual = torch.sqrt(2.0 * loss.clamp(min=0.0) / k) / y_rms.clamp(min=1e-30)
+            done = criteria.converged(loss, prev_loss, grad, rel_residual)
+            prev_loss = loss.detach()
+            any_done = bool(done.any())
+        if not any_done:
+            continue
+
+        finished = rows[done]
+        result[finished] = X[done].detach()
+        iterations[finished.cpu()] = t
+        keep = ~done
+        rows, X, prev_loss = rows[keep], X[keep], prev_loss[keep]
+        state = [s[keep] for s in state]
+        if y is not None and y_rms.shape[0] > 1:
+            y_rms = y_rms[keep]
+        if rows.numel() == 0:
+            break
+
+    result[rows] = X.detach()
+    return result.view_as(x), iterations
+
+
+def conjugate_gradient(matvec, b, precond=None, iters=50, tol=1e-6):
+    """
+    Batched (Jacobi-preconditioned) conjugate gradient for SPD systems A x = b.
+
+    Runs a fixed number of iterations without host syncs; a system whose
+    residual falls below tol ||b|| is frozen by zeroing its step size.
+
+    Args:
+        matvec:  v (B, D) -> A v (B, D)
+        b:       (B, D) right-hand sides
+        precond: optional (B, D) diagonal preconditioner
+        iters:   iterations
+        tol:     relative residual tolerance
+
+    Returns:
+        x: (B, D)
+    """
+    x = torch.zeros_like(b)
+    r = b.clone()
+    z = r if precond is None else r / precond
+    p = z.clone()
+    rz = torch.sum(r * z, dim=-1, keepdim=True)
+    threshold = tol ** 2 * torch.sum(b * b, dim=-1, keepdim=True)
+    for _ in range(iters):
+        running = torch.sum(r * r, dim=-1, keepdim=True) > threshold
+        Ap = matvec(p)
+        pAp = torch.sum(p * Ap, dim=-1, keepdim=True)
+        alpha = torch.where(running, rz / pAp.clamp(min=1e-30), torch.zeros_like(rz))
+        x = x + alpha * p
+        r = r - alpha * Ap
+        z = r if precond is None else r / precond
+        rz_new = torch.sum(r * z, dim=-1, keepdim=True)
+        p = z + (rz_new / rz.clamp(min=1e-30)) * p
+        rz = rz_new
+    return x
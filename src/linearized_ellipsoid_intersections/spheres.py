@@ -0,0 +1,212 @@
+import torch
+from .fusion import gaussian_product, mean_variance
+from .solver import solve
+
+# Compute intersection of two Nd spheres
+def intersect_spheres(mu1, r1, mu2, r2):
+    """
+    Calculates the intersection of two spheres in N dimensions.
+
+    Args:
+        mu1: Tensor, shape (N,), center of the first sphere.
+        r1: Tensor, shape (), radius of the first sphere (scalar).
+        mu2: Tensor, shape (N,), center of the second sphere.
+        r2: Tensor, shape (), radius of the second sphere (scalar).
+
+    Returns:
+        A tuple: (mu_intersection, r_intersection, dim_intersection)
+            mu_intersection: Tensor, shape (N,), the "mean" of the intersection.
+                             If the spheres intersect in a lower-dimensional
+                             hypersphere, this is the center of that hypersphere.
+            r_intersection: Tensor, shape (), the "radius" of the intersection.
+                             If the spheres intersect in a lower-dimensional
+                             hypersphere, this is the radius of that hypersphere.
+            dim_intersection: int, the dimensionality of the intersection.
+                              -  0:  Intersection is two points (a 0-sphere).
+                              -  1:  Intersection is a circle (a 1-sphere).
+                              -  2:  Intersection is a 2-sphere (surface of a 3D ball).
+                              -  ...
+                              -  N-1: Intersection is an (N-1)-sphere.
+                              - -1: No intersection, or spheres are identical.
+
+            Returns (mu1, r1, -1) if the spheres do not intersect or are coincident.
+    """
+    d = torch.linalg.norm(mu1 - mu2)
+
+    # Check for intersection (and handle edge cases)
+    if d > r1 + r2 or d < torch.abs(r1 - r2) or (d == 0 and r1 == r2):
+        return mu1, r1, -1  # No (N-1)-sphere intersection, or identical spheres
+
+    # Direction vector from mu1 to mu2 (unit vector)
+    u = (mu2 - mu1) / d
+
+    # Distance from mu1 to the hyperplane of intersection
+    a = (r1**2 - r2**2 + d**2) / (2 * d)
+    # No need to clamp a here.  The intersection check above guarantees
+    # that 0 <= a <= d.  Clamping can introduce errors.
+
+    # Center of the intersection hypersphere
+    mu_intersection = mu1 + a * u
+
+    # Calculate h (radius of the intersection hypersphere)
+    h_sq = r1**2 - a**2
+    h_sq = torch.clamp(h_sq, min=0.0)  # Ensure non-negative due to numerical error.
+    h = torch.sqrt(h_sq)
+    r_intersection = h
+
+    # Determine the dimensionality of the intersection
+    dim_intersection = mu1.shape[0] - 1
+
+    return mu_intersection, r_intersection, dim_intersection
+
+
+# Batched intersection of pairs of Nd spheres
+def intersect_spheres_batched(mu1, r1, mu2, r2):
+    """
+    Vectorized intersect_spheres over any number of leading batch dimensions.
+
+    Non-intersecting or coincident pairs are handled with torch.where instead
+    of a Python branch, so there is no tensor-to-bool host sync.
+
+    Args:
+        mu1: Tensor, shape (..., N), centers of the first spheres.
+        r1: Tensor, shape (...), radii of the first spheres.
+        mu2: Tensor, shape (..., N), centers of the second spheres.
+        r2: Tensor, shape (...), radii of the second spheres.
+
+    Returns:
+        A tuple: (valid, mu_intersection, r_intersection, dim_intersection)
+            valid: bool Tensor, shape (...), True where the pair intersects.
+            mu_intersection: Tensor, shape (..., N), intersection centers.
+            r_intersection: Tensor, shape (...), intersection radii.
+            dim_intersection: long Tensor, shape (...), N-1 where valid, else -1.
+
+            Invalid pairs return mu1 and r1, matching intersect_spheres.
+    """
+    d = torch.linalg.norm(mu1 - mu2, dim=-1)
+
+    valid = (d <= r1 + r2) & (d >= torch.abs(r1 - r2)) & ~((d == 0) & (r1 == r2))
+
+    # Invalid pairs are masked out below; keep them finite meanwhile.
+    d_safe = torch.where(valid, d, torch.ones_like(d))
+
+    u = (mu2 - mu1) / d_safe.unsqueeze(-1)
+    a = (r1**2 - r2**2 + d_safe**2) / (2 * d_safe)
+    mu_intersection = mu1 + a.unsqueeze(-1) * u
+
+    h_sq = torch.clamp(r1**2 - a**2, min=0.0)
+    h = torch.sqrt(h_sq)
+
+    mu_intersection = torch.where(valid.unsqueeze(-1), mu_intersection, mu1)
+    r_intersection = torch.where(valid, h, r1)
+    dim_intersection = torch.where(
+        valid,
+        torch.full_like(d, mu1.shape[-1] - 1, dtype=torch.long),
+        torch.full_like(d, -1, dtype=torch.long),
+    )
+
+    return valid, mu_intersection, r_intersection, dim_intersection
+
+
+# One-shot intersection of a set of Nd spheres
+def multilaterate(centers, radii):
+    """
+    Intersects N spheres in D dimensions with a single linear solve.
+
+    Subtracting the equation of sphere 0 from every other sphere removes the
+    quadratic term. With z = x - c_0 and d_i = c_i - c_0:
+
+        2 d_i^T z = ||d_i||^2 - r_i^2 + r_0^2,   i = 1..N-1
+
+    If N - 1 >= D the system determines x (least squares for N - 1 > D).
+    Otherwise the solutions form a (D-N+1)-dimensional flat, and the
+    intersection is the sphere in that flat around the foot of the
+    perpendicular from c_0, which is the minimum-norm z. Both cases are one
+    batched QR factorization plus a triangular solve.
+
+    Args:
+        centers: Tensor, shape (..., N, D), sphere centers.
+        radii: Tensor, shape (..., N), sphere radii.
+
+    Returns:
+        A tuple: (mu_intersection, r_intersection)
+            mu_intersection: Tensor, shape (..., D), the estimate x̂ (center of
+                             the residual sphere).
+            r_intersection: Tensor, shape (...), radius of the residual sphere,
+                            the expected error. Zero when x is determined.
+    """
+    c0 = centers[..., 0, :]
+    d = centers[..., 1:, :] - c0.unsqueeze(-2)  # (..., N-1, D)
+    r0 = radii[..., 0]
+    rhs = 0.5 * (d.pow(2).sum(-1) - radii[..., 1:] ** 2 + (r0 ** 2).unsqueeze(-1))  # (..., N-1)
+
+    M, D = d.shape[-2:]
+    if M >= D:
+        # Overdetermined: d = QR, z = R^-1 Q^T rhs
+        Q, R = torch.linalg.qr(d)
+        z = torch.linalg.solve_triangular(R, Q.transpose(-1, -2) @ rhs.unsqueeze(-1), upper=True)
+    else:
+        # Underdetermined: d^T = QR, minimum-norm z = Q R^-T rhs
+        Q, R = torch.linalg.qr(d.transpose(-1, -2))
+        w = torch.linalg.solve_triangular(R.transpose(-1, -2), rhs.unsqueeze(-1), upper=False)
+        z = Q @ w
+    z = z.squeeze(-1)
+
+    mu_intersection = c0 + z
+    if M < D:
+        h_sq = torch.clamp(r0 ** 2 - z.pow(2).sum(-1), min=0.0)
+        r_intersection = torch.sqrt(h_sq)
+    else:
+        r_intersection = torch.zeros_like(r0)
+
+    return mu_intersection, r_intersection
+
+
+# Product of two Nd spheres treated as isotropic Gaussians
+def multiply_spheres(mu1, r1, mu2, r2):
+    """
+    Treats spheres as Gaussians with covariance = r * I.
+    Computes product of two Gaussians.
+
+    The covariances stay scalar variances, so each product is O(D).
+
+    Returns:
+        mu_product: mean of resulting product Gaussian
+        r_product: average variance (mean eigenvalue) as scalar
+    """
+    mu_p, Sigma_p = gaussian_product(mu1, r1, mu2, r2)
+
+    # Expected error proxy: sqrt(mean variance)
+    expected_error = torch.sqrt(mean_variance(Sigma_p))
+
+    return mu_p, expected_error
+
+
+def reconstruct_from_distances_gradient(x_init, y, centroids, num_iters=1000, learning_rate=1e-3, device='cpu',
+                                        criteria=None, x_true=None):
+    """
+    Reconstructs a vector x from its distances to centroids using gradient descent (vectorized).
+
+    num_iters is a cap when criteria (a StoppingCriteria) is given.
+    """
+    k, D = centroids.shape
+    x_est = x_init.clone().detach().to(device)
+    centroids = centroids.to(device)
+    y = y.to(device)  # y should also be on the device
+
+    def step(x, state, t, rows):
+        # Vectorized gradient calculation
+        diffs = x - centroids  # (k, D) - (1, D) broadcasts to (k, D)
+        d_est = torch.norm(diffs, dim=1, keepdim=True)  # (k, 1) distances
+        # Avoid division by zero.  Adding to d_est *before* the division is better.
+        d_est_safe = d_est + 1e-8
+        gradient = torch.sum((d_est_safe - y.view(-1, 1)) * diffs / d_est_safe, dim=0, keepdim=True)
+        loss = 0.5 * torch.sum((d_est - y.view(-1, 1)) ** 2).view(1)  # Calculate Loss
+
+        # Gradient DESCENT update
+        return x - learning_rate * gradient, loss, gradient
+
+    x_est, iterations = solve(x_est, step, num_iters, criteria, y=y, x_true=x_true, label="GD")
+    if criteria is not None:
+        print(f"GD Iterations: {iterations.item()}")
+    return x_est
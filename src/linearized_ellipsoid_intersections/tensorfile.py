@@ -0,0 +1,100 @@
+import json
+import os
+import torch
+
+# Memory-mappable tensor files, shared by the ellipsoid bank format and the
+# dataset cache.
+#
+# [magic (8 bytes)][header length (uint64 LE)][JSON header][arrays...]
+#
+# The header records the format version, the file size, any caller fields and
+# the dtype, shape and byte offset of every array. Arrays are raw little-endian
+# values aligned to 64 bytes, so read_tensors maps the whole file once as bytes
+# and reinterprets each slice in place: zero-copy views on the CPU. Mappings
+# are private: pages come from the shared page cache until written to.
+
+_ALIGN = 64
+
+
+def _align(n):
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _dtype_name(dtype):
+    return str(dtype).replace('torch.', '')
+
+
+def write_tensors(path, magic, version, tensors, **fields):
+    """
+    Write a dict of tensors plus JSON-serializable header fields to path.
+
+    The file is written under a temporary name in the same directory and
+    renamed into place, so concurrent readers never map a partial file.
+
+    Args:
+        magic:   8-byte file signature
+        version: format version stored in the header
+        tensors: dict name -> tensor, any device and dtype
+    """
+    def make_header(offsets, file_size):
+        return json.dumps({
+            'version': version,
+            **fields,
+            'file_size': file_size,
+            'arrays': {name: {'dtype': _dtype_name(t.dtype), 'shape': list(t.shape), 'offset': offsets[name]}
+                       for name, t in tensors.items()},
+        }).encode('utf-8')
+
+    # Size the header region with oversized placeholder offsets, then lay out the arrays after it.
+    placeholder = 10 ** 18
+    offset = _align(16 + len(make_header({name: placeholder for name in tensors}, placeholder)))
+    offsets = {}
+    for name, t in tensors.items():
+        offsets[name] = offset
+        offset = _align(offset + t.nelement() * t.element_size())
+    header_bytes = make_header(offsets, offset)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(magic)
+        f.write(len(header_bytes).to_bytes(8, 'little'))
+        f.write(header_bytes)
+        for name, t in tensors.items():
+            f.seek(offsets[name])
+            t = t.detach().cpu().contiguous().reshape(-1)
+            step = max(1, (1 << 24) // t.element_size())   # 16 MiB per write
+            for start in range(0, t.shape[0], step):
+                f.write(t[start:start + step].numpy().tobytes())
+        f.truncate(offset)
+    os.replace(tmp_path, path)
+
+
+def read_tensors(path, magic, version):
+    """
+    Map a file written by write_tensors.
+
+    Arrays without their own dtype entry take the header-level 'dtype'
+    (single-dtype files written before per-array dtypes were recorded).
+
+    Returns:
+        tensors: dict of CPU tensors that are views of the mapped file
+        header:  the JSON header, including the caller's fields
+    """
+    with open(path, 'rb') as f:
+        if f.read(8) != magic:
+            raise ValueError(f"{path}: unrecognized file, expected signature {magic!r}")
+        n = int.from_bytes(f.read(8), 'little')
+        header = json.loads(f.read(n).decode('utf-8'))
+    if header['version'] != version:
+        raise ValueError(f"{path}: unsupported version {header['version']}, expected {version}")
+
+    flat = torch.from_file(path, shared=False, size=header['file_size'], dtype=torch.uint8)
+    tensors = {}
+    for name, entry in header['arrays'].items():
+        dtype = getattr(torch, entry.get('dtype', header.get('dtype')))
+        numel = 1
+        for dim in entry['shape']:
+            numel *= dim
+        nbytes = numel * torch.empty(0, dtype=dtype).element_size()
+        tensors[name] = flat[entry['offset']:entry['offset'] + nbytes].view(dtype).view(entry['shape'])
+    return tensors, header